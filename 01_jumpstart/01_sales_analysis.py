@@ -54,16 +54,17 @@ help(pd.read_excel)
 getcwd()
 
 # %%
-bikes_df = pd.read_excel("00_data_raw/bikes.xlsx")
+# - read_raw() reads a typed Parquet copy of each workbook, converting
+#   the xlsx on first use or when it changes (see my_pandas_extensions.raw_data)
+from my_pandas_extensions.raw_data import read_raw
+
+bikes_df = read_raw("00_data_raw/bikes.xlsx")
 bikes_df
 
-bikeshops_df = pd.read_excel("00_data_raw/bikeshops.xlsx")
+bikeshops_df = read_raw("00_data_raw/bikeshops.xlsx")
 bikeshops_df
 
-orderlines_df = pd.read_excel(
-    io = "00_data_raw/orderlines.xlsx",
-    converters= {'order.date': str}
-)
+orderlines_df = read_raw("00_data_raw/orderlines.xlsx")
 orderlines_df.info()
 
 # %%
@@ -19,24 +19,55 @@ engine = sql.create_engine("sqlite:///00_database/bike_orders_database.sqlite")
 conn = engine.connect()
 
 # Read Excel Files
+# - read_raw() converts each workbook to Parquet once and reads the
+#   Parquet copy afterwards (re-converting if the xlsx changes)
 
-bikes_df = pd.read_excel("./00_data_raw/bikes.xlsx")
-bikeshops_df = pd.read_excel("./00_data_raw/bikeshops.xlsx")
-orderlines_df = pd.read_excel("./00_data_raw/orderlines.xlsx")
+from my_pandas_extensions.raw_data import read_raw
+
+bikes_df = read_raw("./00_data_raw/bikes.xlsx")
+bikeshops_df = read_raw("./00_data_raw/bikeshops.xlsx")
+orderlines_df = read_raw("./00_data_raw/orderlines.xlsx")
 
 
 # Create Tables
-bikes_df.to_sql("bikes", con=conn)
+# - load_tables() bulk-inserts all three tables in one transaction with
+#   explicit column types, and skips the "index" / "Unnamed: 0" columns
+
+from my_pandas_extensions.database import load_tables
+
+load_tables(
+    {
+        "bikes"      : bikes_df,
+        "bikeshops"  : bikeshops_df,
+        "orderlines" : orderlines_df
+    },
+    conn_string = "sqlite:///00_database/bike_orders_database.sqlite",
+    if_exists   = "replace"
+)
+
+# - A failed load changes nothing: the duplicate order line key below rolls
+#   back the replace of bikes too, so no table is left dropped or empty
+
+bikes_before_df = pd.read_sql("SELECT * FROM bikes", con=conn)
+
+try:
+    load_tables(
+        {
+            "bikes"      : bikes_df,
+            "orderlines" : pd.concat([orderlines_df, orderlines_df.head(1)])
+        },
+        conn_string = "sqlite:///00_database/bike_orders_database.sqlite",
+        if_exists   = "replace"
+    )
+except sql.exc.IntegrityError as error:
+    print(error.orig)
+
+pd.testing.assert_frame_equal(pd.read_sql("SELECT * FROM bikes", con=conn), bikes_before_df)
 
 pd.read_sql("SELECT * FROM bikes", con=conn)
 
-bikeshops_df.to_sql("bikeshops", con=conn)
 pd.read_sql("SELECT * FROM bikeshops", con=conn)
 
-orderlines_df \
-    .iloc[: , 1:] \
-    .to_sql("orderlines", con=conn, if_exists="replace")
-
 pd.read_sql("SELECT * FROM orderlines", con = conn)
 
 
@@ -68,4 +99,13 @@ table = inspector.get_table_names()
 pd.read_sql(f"SELECT * FROM {table[2]}", con=conn)
 
 # Close connection
-conn.close()
\ No newline at end of file
+conn.close()
+
+# OPTIMIZING THE DATABASE ----
+
+# Indexes for the collect_data() joins and date filters, plus ANALYZE.
+# Returns the query plans before and after.
+
+from my_pandas_extensions.database import optimize_database
+
+optimize_database("sqlite:///00_database/bike_orders_database.sqlite", vacuum = True)
@@ -7,3 +7,75 @@ from my_pandas_extensions.database import collect_data
 
 collect_data(conn_string="sqlite:///00_database/bike_orders_database.sqlite")
 
+
+# Backend parity on descriptions / locations with missing parts ----
+
+import os
+import shutil
+import tempfile
+
+import sqlalchemy as sql
+
+tmp_dir = tempfile.mkdtemp()
+shutil.copy("00_database/bike_orders_database.sqlite", tmp_dir)
+tmp_conn_string = f"sqlite:///{os.path.join(tmp_dir, 'bike_orders_database.sqlite')}"
+
+with sql.create_engine(tmp_conn_string).begin() as conn:
+    update_bike = sql.text('UPDATE bikes SET description = :value WHERE "bike.id" = :id')
+    conn.execute(update_bike, {"value": "Road - Elite Road", "id": 1})
+    conn.execute(update_bike, {"value": "Road", "id": 2})
+    conn.execute(
+        sql.text('UPDATE bikeshops SET location = :value WHERE "bikeshop.id" = :id'),
+        {"value": "Ithaca", "id": 1}
+    )
+
+pandas_df = collect_data(tmp_conn_string, use_wrangled = False)
+
+for backend in ["sql", "arrow", "duckdb", "polars"]:
+    pd.testing.assert_frame_equal(pandas_df, collect_data(tmp_conn_string, backend = backend, use_wrangled = False))
+
+shutil.rmtree(tmp_dir)
+
+
+# Streaming in chunks ----
+
+from my_pandas_extensions.database import collect_data_chunked
+
+for chunk_df in collect_data_chunked(chunksize = 5000):
+    print(chunk_df.shape)
+
+
+# Sharded databases (one SQLite file per year) ----
+
+# collect_data("sqlite:///00_database/shards/orders_*.sqlite", start_date = "2015-01-01", compact = True)
+
+
+# In-memory result cache (repeated calls in one process) ----
+
+from my_pandas_extensions.database import result_cache_info, invalidate_result_cache
+
+collect_data(memory_cache = True)
+collect_data(memory_cache = True)
+
+result_cache_info()
+
+invalidate_result_cache()
+
+
+# Asyncio (e.g. inside an async web handler) ----
+
+import asyncio
+
+from my_pandas_extensions.database import collect_data_async
+
+async def main():
+    # Several requests share one event loop; table reads overlap. SQLite
+    # connections close after each query, so asyncio.run() returns and the
+    # script exits; with a pooled server database (e.g. asyncpg), also
+    # await dispose_async_engines() before the loop ends
+    return await asyncio.gather(
+        collect_data_async(start_date = "2015-01-01"),
+        collect_data_async(columns = ["order_date", "category_2", "total_price"])
+    )
+
+df_list = asyncio.run(main())
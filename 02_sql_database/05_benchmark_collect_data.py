@@ -0,0 +1,143 @@
+# DS4B 101-P: PYTHON FOR DATA SCIENCE AUTOMATION ----
+# SQL DATABASES (Module 2): Benchmarking collect_data() backends ----
+
+# IMPORTS ----
+
+import time
+import tracemalloc
+
+import pandas as pd
+
+from my_pandas_extensions.database import collect_data, collect_data_stats, collect_star, memory_usage_report
+
+CONN_STRING = "sqlite:///00_database/bike_orders_database.sqlite"
+
+# BENCHMARK HELPER ----
+
+def benchmark(func, n_runs = 5, **kwargs):
+    """Returns the best wall time (seconds) and the peak traced memory (MB) of func(**kwargs)."""
+
+    timings = []
+    for _ in range(n_runs):
+        start = time.perf_counter()
+        func(**kwargs)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(**kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(timings), peak / 1e6
+
+# 1.0 PANDAS MERGE vs SQL JOIN ----
+
+# - Same output ----
+
+pandas_df = collect_data(CONN_STRING, backend = "pandas")
+sql_df    = collect_data(CONN_STRING, backend = "sql")
+
+pd.testing.assert_frame_equal(pandas_df, sql_df)
+
+# - Timing & peak memory ----
+
+results_list = []
+for backend in ["pandas", "sql"]:
+    seconds, peak_mb = benchmark(collect_data, conn_string = CONN_STRING, backend = backend)
+    results_list.append({"backend": backend, "seconds": seconds, "peak_mb": peak_mb})
+
+pd.DataFrame(results_list)
+
+# 2.0 COMPACT DTYPES: MEMORY USAGE ----
+
+compact_df = collect_data(CONN_STRING, compact = True)
+
+memory_usage_report(before = pandas_df, after = compact_df)
+
+# 3.0 SEQUENTIAL vs CONCURRENT TABLE READS ----
+
+# - verbose = True prints per-table read times and the time saved by overlap
+
+collect_data(CONN_STRING, concurrent = False, verbose = True)
+
+collect_data(CONN_STRING, concurrent = True, verbose = True)
+
+results_list = []
+for concurrent in [False, True]:
+    seconds, peak_mb = benchmark(collect_data, conn_string = CONN_STRING, concurrent = concurrent)
+    results_list.append({"concurrent": concurrent, "seconds": seconds, "peak_mb": peak_mb})
+
+pd.DataFrame(results_list)
+
+# 4.0 DUCKDB / POLARS: JOIN + SUMMARIZE IN-PROCESS ----
+
+from my_pandas_extensions.timeseries import summarize_by_time
+
+def summarize(engine = "pandas"):
+    # lazy = True: with "duckdb" / "polars" the joined data stays in the
+    # engine, only the summary reaches pandas
+    data = collect_data(
+        CONN_STRING,
+        backend = engine,
+        lazy    = engine != "pandas"
+    )
+
+    return summarize_by_time(
+        data,
+        date_column  = "order_date",
+        value_column = "total_price",
+        groups       = ["bikeshop_name", "category_2"],
+        rule         = "W",
+        engine       = engine
+    )
+
+# - Same output (DatetimeIndex.freq is metadata pandas only sets in some cases) ----
+
+pandas_summary_df = summarize("pandas")
+
+pd.testing.assert_frame_equal(pandas_summary_df, summarize("duckdb"), check_freq = False)
+pd.testing.assert_frame_equal(pandas_summary_df, summarize("polars"), check_freq = False)
+
+results_list = []
+for engine in ["pandas", "duckdb", "polars"]:
+    seconds, peak_mb = benchmark(summarize, engine = engine)
+    results_list.append({"engine": engine, "seconds": seconds, "peak_mb": peak_mb})
+
+pd.DataFrame(results_list)
+
+# 5.0 STAR SCHEMA: KEYS + DIMENSION TABLES ----
+
+star = collect_star(CONN_STRING)
+
+star
+
+# - Dimension columns are built on demand, e.g. for a groupby ----
+
+star.materialize(["category_2", "total_price"]) \
+    .groupby("category_2") \
+    .sum()
+
+pd.DataFrame({
+    "representation" : ["collect_data()", "collect_data(compact = True)", "collect_star()"],
+    "memory_mb"      : [
+        pandas_df.memory_usage(deep = True).sum() / 1e6,
+        compact_df.memory_usage(deep = True).sum() / 1e6,
+        star.memory_usage() / 1e6
+    ]
+})
+
+# 6.0 PER-PHASE INSTRUMENTATION ----
+
+# - One call: wall time, rows in/out and peak memory of each phase ----
+
+instrumented_df = collect_data(CONN_STRING, instrument = True)
+
+pd.DataFrame(instrumented_df.attrs["collect_data_record"]["phases"])
+
+# - Totals across calls, per backend & phase ----
+
+for backend in ["pandas", "sql", "arrow"]:
+    for _ in range(3):
+        collect_data(CONN_STRING, backend = backend, instrument = True)
+
+collect_data_stats()
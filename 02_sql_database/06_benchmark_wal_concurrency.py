@@ -0,0 +1,133 @@
+# DS4B 101-P: PYTHON FOR DATA SCIENCE AUTOMATION ----
+# SQL DATABASES (Module 2): Concurrent readers & one writer (WAL vs rollback journal) ----
+
+# N reader processes call collect_data() in a loop while one writer process
+# keeps appending orderlines. Each run works on a temporary copy of the
+# database, once with the default rollback journal and once in WAL mode.
+
+# IMPORTS ----
+
+import multiprocessing as mp
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+import sqlalchemy as sql
+
+from my_pandas_extensions.database import collect_data, get_engine, setup_wal
+
+DATABASE_PATH = "00_database/bike_orders_database.sqlite"
+
+N_READERS   = 4
+DURATION    = 10     # seconds
+WRITE_BATCH = 500    # orderlines rows per write transaction
+
+# WORKERS ----
+
+def reader(conn_string, profile, duration, queue):
+    """Calls collect_data() until `duration` runs out; reports successes, errors, latency and rows read."""
+
+    n_ok, n_errors, n_rows, latencies = 0, 0, 0, []
+
+    stop = time.perf_counter() + duration
+    while time.perf_counter() < stop:
+        start = time.perf_counter()
+        try:
+            n_rows += len(collect_data(conn_string, profile = profile))
+            n_ok += 1
+            latencies.append(time.perf_counter() - start)
+        except sql.exc.OperationalError:
+            n_errors += 1
+
+    queue.put({
+        "role"       : "reader",
+        "ok"         : n_ok,
+        "errors"     : n_errors,
+        "mean_secs"  : sum(latencies) / max(len(latencies), 1),
+        "rows"       : n_rows
+    })
+
+
+def writer(conn_string, profile, duration, queue):
+    """Appends batches of copied orderlines with new order ids until `duration` runs out."""
+
+    engine = get_engine(conn_string, profile = profile)
+
+    with engine.connect() as conn:
+        template_df = pd.read_sql("SELECT * FROM orderlines LIMIT 1000", con = conn)
+        next_order_id = conn.execute(sql.text('SELECT max("order.id") FROM orderlines')).scalar() + 1
+
+    n_ok, n_errors = 0, 0
+
+    stop = time.perf_counter() + duration
+    while time.perf_counter() < stop:
+        batch_df = template_df.sample(WRITE_BATCH, replace = True).assign(**{
+            "order.id": range(next_order_id, next_order_id + WRITE_BATCH)
+        })
+        try:
+            with engine.begin() as conn:
+                batch_df.to_sql("orderlines", con = conn, if_exists = "append", index = False)
+            next_order_id += WRITE_BATCH
+            n_ok += 1
+        except sql.exc.OperationalError:
+            n_errors += 1
+
+    queue.put({
+        "role"      : "writer",
+        "ok"        : n_ok,
+        "errors"    : n_errors,
+        "mean_secs" : None,
+        "rows"      : n_ok * WRITE_BATCH
+    })
+
+
+# BENCHMARK ----
+
+def run(journal_mode):
+    """Runs N_READERS readers and one writer against a fresh copy of the database."""
+
+    tmp_dir = tempfile.mkdtemp()
+    db_path = os.path.join(tmp_dir, "bike_orders_database.sqlite")
+    shutil.copy(DATABASE_PATH, db_path)
+
+    conn_string = f"sqlite:///{db_path}"
+
+    if journal_mode == "wal":
+        setup_wal(conn_string)
+        reader_profile, writer_profile = "wal_reader", "wal_writer"
+    else:
+        reader_profile, writer_profile = "default", "default"
+
+    queue = mp.Queue()
+
+    processes = [
+        mp.Process(target = reader, args = (conn_string, reader_profile, DURATION, queue))
+        for _ in range(N_READERS)
+    ]
+    processes.append(
+        mp.Process(target = writer, args = (conn_string, writer_profile, DURATION, queue))
+    )
+
+    for p in processes:
+        p.start()
+
+    results_list = [queue.get() for _ in processes]
+
+    for p in processes:
+        p.join()
+
+    shutil.rmtree(tmp_dir)
+
+    return pd.DataFrame(results_list) \
+        .groupby("role") \
+        .agg({"ok": "sum", "errors": "sum", "mean_secs": "mean", "rows": "sum"}) \
+        .assign(journal_mode = journal_mode)
+
+
+if __name__ == "__main__":
+
+    results_df = pd.concat([run("delete"), run("wal")])
+
+    print(results_df)
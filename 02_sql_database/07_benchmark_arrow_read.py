@@ -0,0 +1,97 @@
+# DS4B 101-P: PYTHON FOR DATA SCIENCE AUTOMATION ----
+# SQL DATABASES (Module 2): Arrow-native reads vs pd.read_sql ----
+
+# Builds a synthetic orderlines table with N_ROWS rows (resampled from the
+# course database) in a temporary SQLite file, then times collect_data()
+# with the "sql" backend (pd.read_sql over DBAPI tuples) against the
+# "arrow" backend (ADBC -> Arrow buffers), with numpy and pyarrow dtypes.
+
+# IMPORTS ----
+
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from my_pandas_extensions.database import collect_data, load_tables
+
+CONN_STRING = "sqlite:///00_database/bike_orders_database.sqlite"
+
+N_ROWS = 3000000
+
+# 1.0 SYNTHETIC DATABASE ----
+
+def make_synthetic_database(n_rows, db_path):
+    """Writes bikes, bikeshops and n_rows resampled orderlines to a new SQLite file."""
+
+    source_dict = {
+        table: pd.read_sql(f"SELECT * FROM {table}", con = CONN_STRING)
+        for table in ["bikes", "bikeshops", "orderlines"]
+    }
+
+    rng = np.random.default_rng(123)
+
+    orderlines_df = source_dict["orderlines"] \
+        .sample(n_rows, replace = True, random_state = 123) \
+        .sort_values("order.date") \
+        .reset_index(drop = True)
+
+    orderlines_df["order.id"]   = np.arange(1, n_rows + 1)
+    orderlines_df["order.line"] = 1
+    orderlines_df["quantity"]   = rng.integers(1, 5, n_rows)
+    orderlines_df["order.date"] = pd.to_datetime(orderlines_df["order.date"])
+
+    source_dict["orderlines"] = orderlines_df
+
+    load_tables(source_dict, conn_string = f"sqlite:///{db_path}", if_exists = "replace")
+
+
+tmp_dir = tempfile.mkdtemp()
+db_path = os.path.join(tmp_dir, "synthetic_orders.sqlite")
+
+make_synthetic_database(N_ROWS, db_path)
+
+synthetic_conn_string = f"sqlite:///{db_path}"
+
+# 2.0 BENCHMARK ----
+
+def time_it(n_runs = 3, **kwargs):
+    """Best wall time of collect_data(**kwargs) and the frame it returned."""
+
+    timings = []
+    for _ in range(n_runs):
+        start = time.perf_counter()
+        df = collect_data(synthetic_conn_string, **kwargs)
+        timings.append(time.perf_counter() - start)
+
+    return min(timings), df
+
+
+results_list = []
+frame_dict   = {}
+for label, kwargs in {
+    "sql (pd.read_sql)"       : {"backend": "sql"},
+    "arrow (numpy dtypes)"    : {"backend": "arrow"},
+    "arrow (pyarrow dtypes)"  : {"backend": "arrow", "dtype_backend": "pyarrow"},
+}.items():
+    seconds, df = time_it(**kwargs)
+    frame_dict[label] = df
+    results_list.append({
+        "read_path"  : label,
+        "rows"       : len(df),
+        "seconds"    : seconds,
+        "memory_mb"  : df.memory_usage(deep = True).sum() / 1e6
+    })
+
+# - Same data from both paths ----
+
+pd.testing.assert_frame_equal(frame_dict["sql (pd.read_sql)"], frame_dict["arrow (numpy dtypes)"])
+
+results_df = pd.DataFrame(results_list)
+
+print(results_df)
+
+shutil.rmtree(tmp_dir)
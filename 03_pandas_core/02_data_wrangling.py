@@ -586,8 +586,10 @@ sales_by_cat1_cat2_year_df \
 
 # 8.0 JOINING DATA ----
 
-orderlines_df = pd.read_excel("00_data_raw/orderlines.xlsx")
-bikes_df      = pd.read_excel("00_data_raw/bikes.xlsx")
+from my_pandas_extensions.raw_data import read_raw
+
+orderlines_df = read_raw("00_data_raw/orderlines.xlsx")
+bikes_df      = read_raw("00_data_raw/bikes.xlsx")
 
 # Merge (Joining)
 
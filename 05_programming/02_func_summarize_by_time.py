@@ -182,3 +182,17 @@ df \
     .plot(subplots = True, legend = False)
 
 
+
+# SEVERAL AGGREGATIONS PER VALUE COLUMN (one grouped pass)
+
+df \
+    .summarize_by_time(
+        date_column = 'order_date',
+        agg_func    = {
+            'total_price' : [np.sum, np.mean, 'count'],
+            'quantity'    : np.sum
+        },
+        groups      = "category_1",
+        rule        = "Q",
+        wide_format = False
+    )
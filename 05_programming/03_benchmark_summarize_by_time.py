@@ -0,0 +1,63 @@
+# DS4B 101-P: PYTHON FOR DATA SCIENCE AUTOMATION ----
+# Module 5 (Programming): summarize_by_time() engines with many groups ----
+
+# Times summarize_by_time() with the "pandas" engine (groupby -> resample ->
+# agg -> unstack) against the "numpy" engine (factorized groups and bin
+# codes aggregated with np.bincount/reduceat into the wide matrix) when
+# grouping by bikeshop and model (~2,500 groups), and checks both give the
+# same wide frame.
+
+# IMPORTS ----
+
+import time
+
+import pandas as pd
+
+from my_pandas_extensions.database import collect_data
+from my_pandas_extensions.timeseries import summarize_by_time
+
+df = collect_data()
+
+# BENCHMARK ----
+
+def time_it(engine, rule, agg_func, n_runs = 3):
+    """Best wall time of summarize_by_time() with an engine, and the frame it returned."""
+
+    timings = []
+    for _ in range(n_runs):
+        start = time.perf_counter()
+        summary_df = summarize_by_time(
+            df,
+            date_column  = "order_date",
+            value_column = ["total_price", "quantity"],
+            groups       = ["bikeshop_name", "model"],
+            rule         = rule,
+            agg_func     = agg_func,
+            engine       = engine
+        )
+        timings.append(time.perf_counter() - start)
+
+    return min(timings), summary_df
+
+
+results_list = []
+for rule, agg_func in [("W", "sum"), ("M", "sum"), ("M", "mean"), ("Q", ["sum", "count"])]:
+
+    pandas_seconds, pandas_df = time_it("pandas", rule, agg_func, n_runs = 1)
+    numpy_seconds,  numpy_df  = time_it("numpy",  rule, agg_func)
+
+    # - Same wide frame from both engines ----
+    pd.testing.assert_frame_equal(pandas_df, numpy_df, check_freq = False)
+
+    results_list.append({
+        "rule"           : rule,
+        "agg_func"       : str(agg_func),
+        "shape"          : numpy_df.shape,
+        "pandas_seconds" : pandas_seconds,
+        "numpy_seconds"  : numpy_seconds,
+        "speedup"        : pandas_seconds / numpy_seconds
+    })
+
+results_df = pd.DataFrame(results_list)
+
+print(results_df)
@@ -2,89 +2,3397 @@
 
 # IMPORTS ----
 
+import asyncio
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.parse import urlencode
+from concurrent.futures import ThreadPoolExecutor
+
 import sqlalchemy as sql
 import pandas as pd
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+# CONSTANTS ----
+
+TABLE_NAMES = ['bikes', 'bikeshops', 'orderlines']
+
+COLS_TO_KEEP_LIST = [
+    'order.id', 'order.line', 'order.date',
+    'quantity', 'price', 'total.price',
+    'model', 'category.1', 'category.2', 'frame.material',
+    'bikeshop.name', 'city', 'state'
+]
+
+OUTPUT_COLUMNS = [col.replace(".", "_") for col in COLS_TO_KEEP_LIST]
+
+# Output column types of a non-empty result (price and total_price become
+# float64 when an order line has no matching bike). Zero-row results are
+# cast to them, since an empty read cannot infer types.
+OUTPUT_DTYPES = {
+    'order_id'       : 'int64',
+    'order_line'     : 'int64',
+    'order_date'     : 'datetime64[ns]',
+    'quantity'       : 'int64',
+    'price'          : 'int64',
+    'total_price'    : 'int64',
+    'model'          : 'object',
+    'category_1'     : 'object',
+    'category_2'     : 'object',
+    'frame_material' : 'object',
+    'bikeshop_name'  : 'object',
+    'city'           : 'object',
+    'state'          : 'object'
+}
+
+# Low-cardinality text columns and small integer columns shrunk by compact_frame()
+CATEGORY_COLUMNS = [
+    'model', 'category_1', 'category_2', 'frame_material',
+    'bikeshop_name', 'city', 'state'
+]
+
+DOWNCAST_COLUMNS = ['order_id', 'order_line', 'quantity']
+
+# Explicit column types and keys used by load_tables(). Types match what
+# DataFrame.to_sql() created originally, minus the pandas "index" column.
+TABLE_SCHEMAS = {
+    'bikes': {
+        'columns' : {
+            'bike.id'     : 'BIGINT',
+            'model'       : 'TEXT',
+            'description' : 'TEXT',
+            'price'       : 'BIGINT'
+        },
+        'key' : ['bike.id']
+    },
+    'bikeshops': {
+        'columns' : {
+            'bikeshop.id'   : 'BIGINT',
+            'bikeshop.name' : 'TEXT',
+            'location'      : 'TEXT'
+        },
+        'key' : ['bikeshop.id']
+    },
+    'orderlines': {
+        'columns' : {
+            'order.id'    : 'BIGINT',
+            'order.line'  : 'BIGINT',
+            'order.date'  : 'DATETIME',
+            'customer.id' : 'BIGINT',
+            'product.id'  : 'BIGINT',
+            'quantity'    : 'BIGINT'
+        },
+        'key' : ['order.id', 'order.line']
+    }
+}
+
+# Materialized copy of the collect_data() output kept inside the database,
+# see refresh_wrangled_table(). row_order is the source orderlines rowid.
+WRANGLED_TABLE = "orderlines_wrangled"
+
+WRANGLED_TABLE_SQL = f"""
+CREATE TABLE IF NOT EXISTS {WRANGLED_TABLE} (
+    row_order      INTEGER PRIMARY KEY,
+    order_id       BIGINT,
+    order_line     BIGINT,
+    order_date     DATETIME,
+    quantity       BIGINT,
+    price          BIGINT,
+    total_price    BIGINT,
+    model          TEXT,
+    category_1     TEXT,
+    category_2     TEXT,
+    frame_material TEXT,
+    bikeshop_name  TEXT,
+    city           TEXT,
+    state          TEXT
+)
+"""
+
+# Indexes used by the collect_data() joins, date-range and watermark filters
+INDEX_DICT = {
+    'ix_orderlines_order_date'  : ('orderlines', '"order.date"'),
+    'ix_orderlines_order_id'    : ('orderlines', '"order.id"'),
+    'ix_orderlines_product_id'  : ('orderlines', '"product.id"'),
+    'ix_orderlines_customer_id' : ('orderlines', '"customer.id"'),
+    'ix_bikes_bike_id'          : ('bikes', '"bike.id"'),
+    'ix_bikeshops_bikeshop_id'  : ('bikeshops', '"bikeshop.id"')
+}
+
+WRANGLED_INDEX_DICT = {
+    f'ix_{WRANGLED_TABLE}_order_date' : (WRANGLED_TABLE, 'order_date'),
+    f'ix_{WRANGLED_TABLE}_order_id'   : (WRANGLED_TABLE, 'order_id')
+}
+
+# Source watermark of WRANGLED_TABLE: count(*) and max(rowid) of each source
+# table at the last refresh, and the number of rows updated or deleted since
+# (counted by the WRANGLED_TRIGGERS). The table is current only while all
+# three match; otherwise readers fall back to the live join.
+WRANGLED_SOURCE_TABLE = f"{WRANGLED_TABLE}_source"
+
+WRANGLED_SOURCE_SQL = f"""
+CREATE TABLE IF NOT EXISTS {WRANGLED_SOURCE_TABLE} (
+    table_name TEXT PRIMARY KEY,
+    row_count  BIGINT,
+    max_rowid  BIGINT,
+    changes    BIGINT
+)
+"""
+
+WRANGLED_TRIGGERS = {
+    f'tr_{table}_{event.lower()}_wrangled' : (table, event)
+    for table in TABLE_NAMES
+    for event in ["UPDATE", "DELETE"]
+}
+
+# Join + cleaning pushed into SQL (SQLite dialect). The string splits use
+# instr()/substr() so only the requested output columns leave the database.
+# Like str.split(), a string with no separator left is kept whole and the
+# parts after it are NULL (e.g. "Road - Elite Road" has no frame_material).
+# They run on the small bikes/bikeshops tables (CTEs bikes_split/shops_split)
+# before the join, so the string work scales with products and customers,
+# not order lines. "LIMIT -1" stops SQLite from flattening those CTEs back
+# into the join (which would split once per order line again); it works on
+# SQLite versions that predate "AS MATERIALIZED". There is no ORDER BY:
+# sorting on rowid would stop SQLite from range-scanning an "order.date"
+# index, so the rows are put back in table order in pandas instead.
+# {orderlines_where}, {columns} and {output_where} are filled in by
+# _build_collect_data_query(); all values travel as bind parameters.
+COLLECT_DATA_SQL = """
+WITH bikes_split_1 AS (
+    SELECT
+        "bike.id" AS bike_id,
+        model,
+        price,
+        CASE WHEN instr(description, :desc_sep) = 0 THEN description
+             ELSE substr(description, 1, instr(description, :desc_sep) - 1) END AS category_1,
+        CASE WHEN instr(description, :desc_sep) > 0
+             THEN substr(description, instr(description, :desc_sep) + length(:desc_sep)) END AS description_rest
+    FROM bikes
+),
+bikes_split_2 AS (
+    SELECT
+        bike_id, model, price, category_1,
+        CASE WHEN instr(description_rest, :desc_sep) = 0 THEN description_rest
+             ELSE substr(description_rest, 1, instr(description_rest, :desc_sep) - 1) END AS category_2,
+        CASE WHEN instr(description_rest, :desc_sep) > 0
+             THEN substr(description_rest, instr(description_rest, :desc_sep) + length(:desc_sep)) END AS description_rest
+    FROM bikes_split_1
+),
+bikes_split AS (
+    SELECT
+        bike_id, model, price, category_1, category_2,
+        CASE WHEN instr(description_rest, :desc_sep) = 0 THEN description_rest
+             ELSE substr(description_rest, 1, instr(description_rest, :desc_sep) - 1) END AS frame_material
+    FROM bikes_split_2
+    LIMIT -1
+),
+shops_split_1 AS (
+    SELECT
+        "bikeshop.id"   AS bikeshop_id,
+        "bikeshop.name" AS bikeshop_name,
+        CASE WHEN instr(location, :loc_sep) = 0 THEN location
+             ELSE substr(location, 1, instr(location, :loc_sep) - 1) END AS city,
+        CASE WHEN instr(location, :loc_sep) > 0
+             THEN substr(location, instr(location, :loc_sep) + length(:loc_sep)) END AS location_rest
+    FROM bikeshops
+),
+shops_split AS (
+    SELECT
+        bikeshop_id, bikeshop_name, city,
+        CASE WHEN instr(location_rest, :loc_sep) = 0 THEN location_rest
+             ELSE substr(location_rest, 1, instr(location_rest, :loc_sep) - 1) END AS state
+    FROM shops_split_1
+    LIMIT -1
+),
+cleaned AS (
+    SELECT
+        o."order.id"         AS order_id,
+        o."order.line"       AS order_line,
+        o."order.date"       AS order_date,
+        o.quantity           AS quantity,
+        b.price              AS price,
+        o.quantity * b.price AS total_price,
+        b.model, b.category_1, b.category_2, b.frame_material,
+        s.bikeshop_name, s.city, s.state,
+        o.rowid              AS row_order
+    FROM orderlines AS o
+    LEFT JOIN bikes_split AS b ON o."product.id"  = b.bike_id
+    LEFT JOIN shops_split AS s ON o."customer.id" = s.bikeshop_id
+    {orderlines_where}
+)
+SELECT {columns}, row_order
+FROM cleaned
+{output_where}
+"""
+
+
+# Join + cleaning for backend = "duckdb" (DuckDB dialect). orderlines,
+# bikes and bikeshops are Arrow tables registered with an in-process DuckDB;
+# orderlines arrives already cut to the date range by SQLite and carries its
+# rowid as row_order. As in COLLECT_DATA_SQL, the splits run on the
+# dimension tables before the join. {columns} and {output_where} are filled
+# in by _collect_data_duckdb().
+DUCKDB_COLLECT_DATA_SQL = """
+WITH bikes_split AS (
+    SELECT
+        "bike.id" AS bike_id,
+        model,
+        price,
+        string_split(description, ' - ')[1] AS category_1,
+        string_split(description, ' - ')[2] AS category_2,
+        string_split(description, ' - ')[3] AS frame_material
+    FROM bikes
+),
+shops_split AS (
+    SELECT
+        "bikeshop.id"   AS bikeshop_id,
+        "bikeshop.name" AS bikeshop_name,
+        string_split(location, ', ')[1] AS city,
+        string_split(location, ', ')[2] AS state
+    FROM bikeshops
+),
+cleaned AS (
+    SELECT
+        o."order.id"                      AS order_id,
+        o."order.line"                    AS order_line,
+        CAST(o."order.date" AS TIMESTAMP) AS order_date,
+        o.quantity                        AS quantity,
+        b.price                           AS price,
+        o.quantity * b.price              AS total_price,
+        b.model, b.category_1, b.category_2, b.frame_material,
+        s.bikeshop_name, s.city, s.state,
+        o.row_order
+    FROM orderlines AS o
+    LEFT JOIN bikes_split AS b ON o."product.id"  = b.bike_id
+    LEFT JOIN shops_split AS s ON o."customer.id" = s.bikeshop_id
+)
+SELECT {columns}
+FROM cleaned
+{output_where}
+"""
+
+# Rows per Arrow batch read through the ADBC SQLite driver (its default is
+# 1024). The driver types each column from the first batch, so a column that
+# is NULL throughout that batch (e.g. model for order lines with no matching
+# bike) is mistyped and a later batch fails; see _fetch_arrow().
+ADBC_BATCH_ROWS = 1048576
+
+
+# CONNECTION PROFILES ----
+
+# Named SQLite tunings for get_engine(profile = ...). "uri_params" are added
+# to the sqlite file: URI the database is opened with and "pragmas" run on
+# every new connection. Both are ignored for non-SQLite databases.
+#
+#   - "analytics": read-only, memory-mapped, large page cache, temp tables in
+#     memory. Safe while another process writes to the database.
+#   - "analytics_immutable": as "analytics", but also tells SQLite the file
+#     cannot change, so it skips locking entirely. Only use it on database
+#     files nobody is writing to (e.g. a published copy).
+#   - "wal_reader" / "wal_writer": for databases switched to WAL with
+#     setup_wal(). Readers never block the writer (and vice versa); the busy
+#     timeout covers the short locks taken by checkpoints. The writer's
+#     checkpoint settings are per connection, so they live here rather than
+#     in setup_wal().
+CONNECTION_PROFILES = {
+    "default": {
+        "uri_params" : {},
+        "pragmas"    : {}
+    },
+    "analytics": {
+        "uri_params" : {"mode": "ro"},
+        "pragmas"    : {
+            "mmap_size"  : 268435456,   # 256 MB
+            "cache_size" : -65536,      # 64 MB (negative = KiB)
+            "temp_store" : "MEMORY",
+            "query_only" : "ON"
+        }
+    },
+    "analytics_immutable": {
+        "uri_params" : {"mode": "ro", "immutable": 1},
+        "pragmas"    : {
+            "mmap_size"  : 268435456,
+            "cache_size" : -65536,
+            "temp_store" : "MEMORY",
+            "query_only" : "ON"
+        }
+    },
+    "wal_reader": {
+        "uri_params" : {},
+        "pragmas"    : {
+            "busy_timeout" : 10000,     # ms
+            "cache_size"   : -65536,
+            "temp_store"   : "MEMORY",
+            "query_only"   : "ON"
+        }
+    },
+    "wal_writer": {
+        "uri_params" : {},
+        "pragmas"    : {
+            "busy_timeout"       : 10000,
+            "synchronous"        : "NORMAL",
+            "wal_autocheckpoint" : 1000,        # pages
+            "journal_size_limit" : 67108864     # 64 MB the WAL is truncated to after a checkpoint
+        }
+    }
+}
+
+
+# ENGINE REGISTRY ----
+
+# One engine (and connection pool) per connection string and profile, shared
+# by every function in this module for the life of the process.
+_ENGINE_REGISTRY = {}
+_ENGINE_REGISTRY_LOCK = threading.Lock()
+
+def get_engine(conn_string, profile = "default", pool_size = 5, max_overflow = 10, pool_recycle = 3600, **kwargs):
+    """
+    Returns the process-wide SQLAlchemy engine for a connection string, creating it on first use.
+
+    Args:
+        conn_string (str): A SQLAlchemy connection string.
+        profile (str, dict, optional): A key of CONNECTION_PROFILES or a dict with "uri_params" and "pragmas". Defaults to "default".
+        pool_size (int, optional): Connections kept open in the pool. Defaults to 5.
+        max_overflow (int, optional): Extra connections allowed beyond pool_size. Defaults to 10.
+        pool_recycle (int, optional): Seconds after which pooled connections are replaced. Defaults to 3600.
+        **kwargs: Passed to sqlalchemy.create_engine().
+
+    Pool options only apply when the engine is first created; later calls
+    with the same `conn_string` and `profile` return the existing engine.
+    Call dispose_engines() to close it and start over.
+
+    Returns:
+        sqlalchemy.engine.Engine: The shared engine.
+    """
+
+    profile_dict = _get_profile(profile)
+
+    key = (conn_string, json.dumps(profile_dict, sort_keys = True))
+
+    with _ENGINE_REGISTRY_LOCK:
+        engine = _ENGINE_REGISTRY.get(key)
+        if engine is None:
+            engine_kwargs = _pool_kwargs(conn_string, pool_size, max_overflow, pool_recycle)
+            engine_kwargs["connect_args"] = {
+                **engine_kwargs.get("connect_args", {}),
+                **kwargs.pop("connect_args", {})
+            }
+            engine_kwargs.update(kwargs)
+
+            engine = sql.create_engine(
+                _profile_conn_string(conn_string, profile_dict),
+                **engine_kwargs
+            )
+            _add_pragmas(engine, profile_dict)
+
+            _ENGINE_REGISTRY[key] = engine
+
+    return engine
+
+
+def dispose_engines(conn_string = None):
+    """
+    Closes pooled connections and removes engines from the registry.
+
+    Args:
+        conn_string (str, optional): Only dispose the engines (all profiles) for this connection string. Defaults to None (dispose all).
+    """
+
+    with _ENGINE_REGISTRY_LOCK:
+        keys = [
+            key for key in _ENGINE_REGISTRY
+            if conn_string is None or key[0] == conn_string
+        ]
+
+        for key in keys:
+            _ENGINE_REGISTRY.pop(key).dispose()
+
+
+def _pool_kwargs(conn_string, pool_size, max_overflow, pool_recycle):
+    """Pool arguments for create_engine(), adjusted for SQLite."""
+
+    url = sql.engine.make_url(conn_string)
+
+    # In-memory SQLite lives inside a single connection, keep the default pool
+    if url.get_backend_name() == "sqlite" and url.database in [None, "", ":memory:"]:
+        return {}
+
+    pool_kwargs = {
+        "poolclass"    : sql.pool.QueuePool,
+        "pool_size"    : pool_size,
+        "max_overflow" : max_overflow,
+        "pool_recycle" : pool_recycle
+    }
+
+    # Pooled SQLite connections are handed between threads
+    if url.get_backend_name() == "sqlite":
+        pool_kwargs["connect_args"] = {"check_same_thread": False}
+
+    return pool_kwargs
+
+
+def _get_profile(profile):
+    """Looks up a named connection profile or validates a profile dict."""
+
+    if type(profile) is dict:
+        return {"uri_params": {}, "pragmas": {}, **profile}
+
+    if profile not in CONNECTION_PROFILES:
+        raise ValueError(f"`profile` must be a dict or one of {list(CONNECTION_PROFILES)}.")
+
+    return CONNECTION_PROFILES[profile]
+
+
+def _profile_conn_string(conn_string, profile_dict):
+    """Rewrites a file-based SQLite connection string as a file: URI carrying the profile's uri_params."""
+
+    url = sql.engine.make_url(conn_string)
+
+    if url.get_backend_name() != "sqlite" or url.database in [None, "", ":memory:"]:
+        return conn_string
+
+    if len(profile_dict["uri_params"]) == 0:
+        return conn_string
+
+    uri_params = {**profile_dict["uri_params"], "uri": "true"}
+
+    return f"{url.drivername}:///file:{url.database}?{urlencode(uri_params)}"
+
+
+def _add_pragmas(engine, profile_dict):
+    """Runs the profile's PRAGMA statements on every new SQLite connection."""
+
+    if engine.dialect.name != "sqlite" or len(profile_dict["pragmas"]) == 0:
+        return
+
+    @sql.event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma, value in profile_dict["pragmas"].items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+        cursor.close()
 
 
 # COLLECT DATA ----
-def collect_data(conn_string = "sqlite:///00_database/bike_orders_database.sqlite"):  
+def collect_data(
+    conn_string = "sqlite:///00_database/bike_orders_database.sqlite",
+    backend     = "pandas",
+    start_date  = None,
+    end_date    = None,
+    columns     = None,
+    filters     = None,
+    cache_dir   = None,
+    snapshot_path = None,
+    compact     = False,
+    concurrent  = False,
+    verbose     = False,
+    profile     = "default",
+    use_wrangled = True,
+    dtype_backend = "numpy",
+    lazy        = False,
+    shard_workers = None,
+    memory_cache = False,
+    instrument  = False
+):
     """
-    Collects and combines the bike orders data. 
+    Collects and combines the bike orders data.
 
     Args:
-        conn_string (str, optional): A SQLAlchemy connection string to find the database. Defaults to "sqlite:///00_database/bike_orders_database.sqlite".
+        conn_string (str, list, optional): A SQLAlchemy connection string to find the database. Defaults to "sqlite:///00_database/bike_orders_database.sqlite".
+
+            Sharded mode: a list of connection strings, or a SQLite connection
+            string whose path is a glob pattern (e.g.
+            "sqlite:///shards/orders_*.sqlite"), reads every shard with the
+            other arguments and stacks the results in shard order (sorted by
+            path for a glob). Shards whose order dates cannot match
+            `start_date`/`end_date` are skipped without being read, using
+            shard_date_range(). With compact = True all shards share the same
+            categories. Cannot be combined with `snapshot_path` or `lazy`.
+        backend (str, optional): Where the join and cleaning run. One of:
+
+            - "pandas": Reads the tables and merges them in pandas.
+            - "sql": Runs a single query that joins, cleans and projects
+              the output columns inside the database (SQLite dialect).
+            - "arrow": Runs the "sql" query through the ADBC SQLite driver,
+              which fetches results straight into Arrow buffers instead of
+              Python tuples. Requires adbc-driver-sqlite and pyarrow.
+            - "duckdb": Reads the tables into Arrow (as "arrow" does) and
+              runs the join and cleaning as multi-threaded SQL in an
+              embedded, in-process DuckDB. Requires duckdb,
+              adbc-driver-sqlite and pyarrow.
+            - "polars": As "duckdb", but the join and cleaning run as a
+              multi-threaded Polars lazy query. Requires polars,
+              adbc-driver-sqlite and pyarrow.
+
+            Defaults to "pandas".
+        start_date (str, datetime, optional): Keep orders on or after this date. Defaults to None (no lower bound).
+        end_date (str, datetime, optional): Keep orders on or before this date (the whole day is included). Defaults to None (no upper bound).
+        columns (list, optional): Output columns to return, e.g. ["order_date", "category_2", "total_price"]. Defaults to None (all columns).
+        filters (dict, optional): Maps output columns to one value or a list of values to keep, e.g. {"category_1": ["Road"], "state": "NY"}. Values must be strings for text columns and whole numbers for integer columns; filter dates with `start_date` and `end_date`. Defaults to None.
+        cache_dir (str, optional): Directory for a Parquet cache of the result, keyed by `conn_string` and the query arguments. The cache is reused until the database fingerprint changes (see database_fingerprint()). Requires pyarrow. Defaults to None (no cache).
+        snapshot_path (str, optional): Incremental mode. Path to a Parquet snapshot directory of the full cleaned history. Only orderlines newer than the snapshot's watermark are fetched, cleaned and written as a new part file; the date range, `columns` and `filters` are then applied when reading the snapshot. See refresh_snapshot() and read_snapshot(). Defaults to None.
+        compact (bool, optional): Return text columns as pandas Categorical and downcast the integer id/quantity columns, see compact_frame(). Defaults to False.
+        concurrent (bool, optional): With backend = "pandas", read the three tables at the same time on a thread pool, one pooled connection per table. Defaults to False.
+        verbose (bool, optional): Print how long each table read took and how much wall-clock time the concurrent reads saved. Defaults to False.
+        profile (str, dict, optional): Connection profile, see CONNECTION_PROFILES. Use "analytics" for read-only, memory-mapped SQLite reads. Defaults to "default".
+        use_wrangled (bool, optional): If the database has the materialized WRANGLED_TABLE (see refresh_wrangled_table()) and it is current with the source tables, read it with a single indexed query instead of joining and cleaning; `backend` and `concurrent` are then not used. A stale table is skipped (with a logged warning) in favour of the live join. Defaults to True.
+        dtype_backend (str, optional): With backend = "arrow", "numpy" returns the usual numpy dtypes and "pyarrow" returns Arrow-backed pandas dtypes (pd.ArrowDtype) that wrap the fetched buffers without a copy. Defaults to "numpy".
+        lazy (bool, optional): With backend = "duckdb" or "polars", return the cleaned data as a DuckDB relation or Polars LazyFrame instead of a pandas data frame. Nothing is computed until it is used, e.g. by summarize_by_time(engine = "duckdb" / "polars"), so the full joined data never has to be loaded into pandas. Rows are not in table order. Cannot be combined with `cache_dir`, `snapshot_path` or `compact`. Defaults to False.
+        shard_workers (int, optional): Sharded mode only. Number of shards read at the same time on a thread pool. Defaults to None (one thread per shard, at most the number of CPUs).
+        memory_cache (bool, optional): Keep the result in the process-wide in-memory LRU cache, keyed by `conn_string` and the arguments that shape the result, and answer repeated calls from it. Entries expire after a TTL, are evicted least recently used first once the cache exceeds its byte budget, and are dropped when a SQLite database file changes or invalidate_result_cache() is called. Every call gets its own copy of the cached frame. See configure_result_cache() and result_cache_info(). Defaults to False.
+        instrument (bool, optional): Measure each phase of the call (connect, table reads, query, merge, string splits, to_datetime, cache, compact, ...): wall time, rows in and out, and peak memory allocated during the phase (tracemalloc, started for the call if it is not already running). The record is attached to the result as `df.attrs["collect_data_record"]`, logged at INFO level on this module's logger and added to the process-wide totals, see collect_data_stats(). Instrumented calls run one at a time, since tracemalloc is process-wide; allocations by other (non-instrumented) threads during a phase count towards its peak. Tracing memory slows the call down, so leave it off by default. Defaults to False.
+
+    The date range is applied to the orderlines table in SQL by all backends.
+    With backend = "sql", `columns` and `filters` are also applied in SQL so
+    unneeded rows and columns never leave the database; the "pandas" backend
+    applies them after cleaning.
 
     Returns:
-        DataFrame: A pandas data frame that combines data from tables:
-        
+        DataFrame: A pandas data frame (or, with lazy = True, a DuckDB relation or Polars LazyFrame) that combines data from tables:
+
             - orderlines: Transactions data
             - bikes: Products data
             - bikeshops: Customers data
     """
 
+    # Checks
+
+    if backend not in ["pandas", "sql", "arrow", "duckdb", "polars"]:
+        raise ValueError("`backend` must be one of 'pandas', 'sql', 'arrow', 'duckdb' or 'polars'.")
+
+    if lazy and backend not in ["duckdb", "polars"]:
+        raise ValueError("`lazy = True` requires backend = 'duckdb' or 'polars'.")
+
+    if lazy and (cache_dir is not None or snapshot_path is not None or compact):
+        raise ValueError("`lazy = True` cannot be combined with `cache_dir`, `snapshot_path` or `compact`.")
+
+    if dtype_backend not in ["numpy", "pyarrow"]:
+        raise ValueError("`dtype_backend` must be one of 'numpy' or 'pyarrow'.")
+
+    if dtype_backend == "pyarrow" and backend != "arrow":
+        raise ValueError("`dtype_backend = 'pyarrow'` requires backend = 'arrow'.")
+
+    if (cache_dir is not None) and (snapshot_path is not None):
+        raise ValueError("Use either `cache_dir` or `snapshot_path`, not both.")
+
+    if concurrent and backend != "pandas":
+        raise ValueError("`concurrent = True` requires backend = 'pandas'.")
+
+    columns, filters = _check_pushdown_args(columns, filters)
+
+    shard_list = _expand_shards(conn_string)
+
+    if shard_list is not None and (snapshot_path is not None or lazy):
+        raise ValueError("A list or glob of connection strings cannot be combined with `snapshot_path` or `lazy`.")
+
+    if memory_cache and lazy:
+        raise ValueError("`memory_cache = True` cannot be combined with `lazy = True`.")
+
     # Body
 
-    # 1.0 Connect to database
+    # 0.0 Instrumented call: the same call, with every phase recorded
 
-    engine = sql.create_engine(conn_string)
+    if instrument:
+        return _collect_data_instrumented(
+            conn_string,
+            backend       = backend,
+            start_date    = start_date,
+            end_date      = end_date,
+            columns       = columns,
+            filters       = filters,
+            cache_dir     = cache_dir,
+            snapshot_path = snapshot_path,
+            compact       = compact,
+            concurrent    = concurrent,
+            verbose       = verbose,
+            profile       = profile,
+            use_wrangled  = use_wrangled,
+            dtype_backend = dtype_backend,
+            lazy          = lazy,
+            shard_workers = shard_workers,
+            memory_cache  = memory_cache
+        )
 
-    conn = engine.connect()
+    # 0.1 In-memory result cache
 
-    table_names = ['bikes', 'bikeshops', 'orderlines']
+    if memory_cache:
+        key = _result_cache_key(
+            conn_string,
+            start_date    = start_date,
+            end_date      = end_date,
+            columns       = columns,
+            filters       = filters,
+            compact       = compact,
+            use_wrangled  = use_wrangled,
+            dtype_backend = dtype_backend
+        )
 
-    data_dict = {}
-    for table in table_names:
-        data_dict[table] = pd.read_sql(f"SELECT * FROM {table}", con=conn) \
-            .drop("index", axis=1)
-    
-    conn.close()
+        with _phase("memory_cache_lookup") as phase:
+            df = _result_cache_get(key)
+            phase["rows_out"] = None if df is None else len(df)
+        if df is not None:
+            return df
 
-    # 2.0 Combining Data
+        # Fingerprint before the read, so a write during it is not cached as current
+        conn_strings = shard_list or [conn_string]
+        fingerprints = _result_cache_fingerprints(conn_strings)
 
-    joined_df = pd.DataFrame(data_dict['orderlines']) \
-        .merge(
-            right    = data_dict['bikes'],
-            how      = 'left',
-            left_on  = 'product.id',
-            right_on = 'bike.id'
-        ) \
-        .merge(
-            right    = data_dict['bikeshops'],
-            how      = "left",
-            left_on  = "customer.id",
-            right_on = 'bikeshop.id'
+        df = collect_data(
+            conn_string,
+            backend       = backend,
+            start_date    = start_date,
+            end_date      = end_date,
+            columns       = columns,
+            filters       = filters,
+            cache_dir     = cache_dir,
+            snapshot_path = snapshot_path,
+            compact       = compact,
+            concurrent    = concurrent,
+            verbose       = verbose,
+            profile       = profile,
+            use_wrangled  = use_wrangled,
+            dtype_backend = dtype_backend,
+            shard_workers = shard_workers
         )
 
-    # 3.0 Cleaning Data 
+        _result_cache_put(key, conn_strings, fingerprints, df)
 
-    df = joined_df
+        return df.copy()
+
+    # 0.2 Sharded mode: one collect_data() per shard, stacked
+
+    if shard_list is not None:
+        with _phase("read_shards") as phase:
+            df = _collect_data_sharded(
+                shard_list,
+                shard_workers = shard_workers,
+                backend       = backend,
+                start_date    = start_date,
+                end_date      = end_date,
+                columns       = columns,
+                filters       = filters,
+                cache_dir     = cache_dir,
+                compact       = compact,
+                concurrent    = concurrent,
+                verbose       = verbose,
+                profile       = profile,
+                use_wrangled  = use_wrangled,
+                dtype_backend = dtype_backend
+            )
+            phase["rows_out"] = len(df)
+        return df
+
+    # 0.3 Incremental snapshot & cache lookup
+
+    if snapshot_path is not None:
+        with _phase("snapshot_refresh"):
+            refresh_snapshot(
+                snapshot_path, conn_string,
+                backend = "sql" if backend in ["arrow", "duckdb", "polars"] else backend,
+                profile = profile
+            )
+        with _phase("snapshot_read") as phase:
+            df = read_snapshot(snapshot_path, start_date, end_date, columns, filters)
+            phase["rows_out"] = len(df)
+        return compact_frame(df) if compact else df
+
+    if cache_dir is not None:
+        cache_path, fingerprint = _cache_lookup(
+            cache_dir, conn_string,
+            start_date = start_date,
+            end_date   = end_date,
+            columns    = columns,
+            filters    = filters,
+            dtype_backend = dtype_backend
+        )
+        if fingerprint is None:
+            with _phase("cache_read") as phase:
+                df = pd.read_parquet(cache_path)
+                phase["rows_out"] = len(df)
+            return compact_frame(df) if compact else df
+
+    # 1.0 Arrow read path (ADBC, no SQLAlchemy connection)
+
+    if backend == "arrow":
+        df = _collect_data_arrow(
+            conn_string,
+            profile       = profile,
+            start_date    = start_date,
+            end_date      = end_date,
+            columns       = columns,
+            filters       = filters,
+            use_wrangled  = use_wrangled,
+            dtype_backend = dtype_backend
+        )
+
+        if cache_dir is not None:
+            _cache_store(df, cache_path, fingerprint)
+
+        return compact_frame(df) if compact else df
+
+    # 1.1 DuckDB / Polars (Arrow tables, join & cleaning in-process)
+
+    if backend in ["duckdb", "polars"]:
+        collect_func = _collect_data_duckdb if backend == "duckdb" else _collect_data_polars
+
+        df = collect_func(
+            conn_string,
+            profile      = profile,
+            start_date   = start_date,
+            end_date     = end_date,
+            columns      = columns,
+            filters      = filters,
+            use_wrangled = use_wrangled,
+            lazy         = lazy
+        )
+
+        if lazy:
+            return df
+
+        if cache_dir is not None:
+            _cache_store(df, cache_path, fingerprint)
+
+        return compact_frame(df) if compact else df
+
+    # 2.0 Connect to database
+
+    with _phase("connect"):
+        conn = get_engine(conn_string, profile = profile).connect()
+
+    try:
+        if use_wrangled and _wrangled_is_current(lambda query: conn.execute(sql.text(query)).fetchall()):
+            df = _collect_data_wrangled(
+                conn,
+                start_date = start_date,
+                end_date   = end_date,
+                columns    = columns,
+                filters    = filters
+            )
+        elif backend == "sql":
+            df = _collect_data_sql(
+                conn,
+                start_date = start_date,
+                end_date   = end_date,
+                columns    = columns,
+                filters    = filters
+            )
+        else:
+            df = _collect_data_pandas(
+                conn,
+                start_date = start_date,
+                end_date   = end_date,
+                columns    = columns,
+                filters    = filters,
+                concurrent = concurrent,
+                verbose    = verbose
+            )
+    finally:
+        conn.close()
+
+    if cache_dir is not None:
+        _cache_store(df, cache_path, fingerprint)
+
+    if compact:
+        df = compact_frame(df)
+
+    return df
+
+
+# SHARDED DATABASES ----
+
+# Order date range per shard, reused while the shard's fingerprint is unchanged
+_SHARD_RANGE_CACHE = {}
+_SHARD_RANGE_CACHE_LOCK = threading.Lock()
+
+def shard_date_range(conn_string, profile = "default"):
+    """
+    Returns the first and last order date in a database.
+
+    Used by sharded collect_data() calls to skip shards that cannot match
+    the date range. The result is kept in memory until database_fingerprint()
+    reports a change, so repeated calls cost a stat() per SQLite shard. With
+    the "order.date" index from optimize_database() the query itself is two
+    index lookups.
+
+    Args:
+        conn_string (str): A SQLAlchemy connection string.
+        profile (str, dict, optional): Connection profile, see CONNECTION_PROFILES. Defaults to "default".
+
+    Returns:
+        tuple: (min_date, max_date) as pandas Timestamps, or (NaT, NaT) if orderlines is empty.
+    """
+
+    fingerprint = database_fingerprint(conn_string)
+
+    with _SHARD_RANGE_CACHE_LOCK:
+        cached = _SHARD_RANGE_CACHE.get(conn_string)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    with get_engine(conn_string, profile = profile).connect() as conn:
+        row = conn.execute(
+            sql.text('SELECT min("order.date"), max("order.date") FROM orderlines')
+        ).fetchone()
+
+    date_range = (pd.Timestamp(row[0]), pd.Timestamp(row[1]))
 
-    df['order.date'] = pd.to_datetime(df['order.date'])
+    with _SHARD_RANGE_CACHE_LOCK:
+        _SHARD_RANGE_CACHE[conn_string] = (fingerprint, date_range)
 
-    temp_df = df['description'].str.split(" - ", expand = True)
-    df['category.1'] = temp_df[0]
-    df['category.2'] = temp_df[1]
-    df['frame.material'] = temp_df[2]
+    return date_range
 
-    temp_df = df['location'].str.split(", ", expand = True)
-    df['city'] = temp_df[0]
-    df['state'] = temp_df[1]
 
-    df['total.price'] = df['quantity'] * df['price']
+def _expand_shards(conn_string):
+    """
+    Returns the list of shard connection strings, or None for a single database.
+
+    A list or tuple is used as is; a SQLite connection string whose path
+    contains glob characters is expanded to the matching files, sorted.
+    """
+
+    if type(conn_string) in [list, tuple]:
+        if len(conn_string) == 0:
+            raise ValueError("`conn_string` is an empty list.")
+        return list(conn_string)
 
-    df.columns
+    url = sql.engine.make_url(conn_string)
 
-    cols_to_keep_list = [
-        'order.id', 'order.line', 'order.date',    
-        'quantity', 'price', 'total.price', 
-        'model', 'category.1', 'category.2', 'frame.material', 
-        'bikeshop.name', 'city', 'state'
+    if url.get_backend_name() != "sqlite" or url.database is None \
+            or not any(char in url.database for char in "*?["):
+        return None
+
+    path_list = sorted(glob.glob(url.database))
+
+    if len(path_list) == 0:
+        raise ValueError(f"No SQLite files match `{url.database}`.")
+
+    return [
+        url.set(database = path).render_as_string(hide_password = False)
+        for path in path_list
     ]
 
-    df = df[cols_to_keep_list]
 
-    df.columns = df.columns.str.replace(".", "_",regex=False)
+def _shard_may_match(conn_string, start_date = None, end_date = None, profile = "default"):
+    """False if the shard has no orders or none in the date range."""
 
-    # df.info()
+    min_date, max_date = shard_date_range(conn_string, profile = profile)
+
+    if pd.isna(min_date):
+        return False
+
+    if start_date is not None and max_date < pd.Timestamp(start_date):
+        return False
+
+    if end_date is not None and min_date >= pd.Timestamp(end_date).normalize() + pd.Timedelta(days = 1):
+        return False
+
+    return True
+
+
+def _collect_data_sharded(shard_list, shard_workers = None, verbose = False, profile = "default", **kwargs):
+    """
+    Runs collect_data() on each shard that can match the date range, on a
+    thread pool, and stacks the results in shard order.
+    """
+
+    start_date = kwargs.get("start_date")
+    end_date   = kwargs.get("end_date")
+
+    match_list = [
+        shard for shard in shard_list
+        if _shard_may_match(shard, start_date, end_date, profile = profile)
+    ]
+
+    if verbose:
+        print(f"shards: {len(match_list)} of {len(shard_list)} can match the date range")
+
+    # Nothing to read: query one shard anyway for an empty frame with the right columns
+    if len(match_list) == 0:
+        match_list = shard_list[:1]
+
+    if shard_workers is None:
+        shard_workers = min(len(match_list), os.cpu_count() or 1)
+
+    def read_shard(shard):
+        return collect_data(shard, verbose = verbose, profile = profile, **kwargs)
+
+    with ThreadPoolExecutor(max_workers = shard_workers) as executor:
+        df_list = list(executor.map(read_shard, match_list))
+
+    return _concat_shards(df_list)
+
+
+def _concat_shards(df_list):
+    """
+    Stacks shard frames. Categorical columns get the union of all shards'
+    categories first (sorted, as compact_frame() creates them), so the
+    stacked column stays Categorical.
+    """
+
+    for col in df_list[0].columns:
+        if all(isinstance(df[col].dtype, pd.CategoricalDtype) for df in df_list):
+            categories = sorted(set().union(*[df[col].cat.categories for df in df_list]))
+            for df in df_list:
+                df[col] = df[col].cat.set_categories(categories)
+
+    return pd.concat(df_list, ignore_index = True)
+
+
+# INSTRUMENTATION ----
+
+# The record of the collect_data(instrument = True) call running on this
+# thread (None when not instrumenting), and per (backend, phase) totals
+# across calls. tracemalloc is process-wide (each phase resets its peak and
+# the call may stop it), so instrumented calls run one at a time under
+# _INSTRUMENT_LOCK.
+_PHASE_LOCAL = threading.local()
+_INSTRUMENT_LOCK = threading.Lock()
+
+_PHASE_STATS = {}
+_PHASE_STATS_LOCK = threading.Lock()
+
+@contextmanager
+def _phase(name, rows_in = None):
+    """
+    Records one phase of an instrumented collect_data() call.
+
+    Yields a dict the caller can set "rows_out" on (it defaults to
+    `rows_in`, for phases that keep every row). Does nothing (but still
+    yields a dict) when the current thread is not instrumenting, so phases
+    can stay in code shared with collect_data_chunked() and friends. A phase
+    started inside another one is folded into the outer phase, since each
+    phase resets the tracemalloc peak.
+    """
+
+    record = getattr(_PHASE_LOCAL, "record", None)
+    info   = {"rows_out": None}
+
+    if record is None or record["active"]:
+        yield info
+        return
+
+    record["active"] = True
+
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+    else:
+        # Python < 3.9: restart tracing to measure this phase's peak on its own
+        tracemalloc.stop()
+        tracemalloc.start()
+
+    baseline = tracemalloc.get_traced_memory()[0]
+    start    = time.perf_counter()
+
+    try:
+        yield info
+    finally:
+        record["active"] = False
+        record["phases"].append({
+            "phase"    : name,
+            "seconds"  : time.perf_counter() - start,
+            "rows_in"  : rows_in,
+            "rows_out" : rows_in if info["rows_out"] is None else info["rows_out"],
+            "peak_mb"  : max(tracemalloc.get_traced_memory()[1] - baseline, 0) / 1e6
+        })
+
+
+def _collect_data_instrumented(conn_string, backend = "pandas", **kwargs):
+    """
+    Runs collect_data(**kwargs) with phase recording on, then logs, aggregates and attaches the record.
+
+    Holds _INSTRUMENT_LOCK for the call, so concurrent instrumented calls
+    wait for each other instead of resetting or stopping each other's
+    tracemalloc. Non-instrumented calls are not held up, and their
+    allocations meanwhile do count towards the phase peaks.
+    """
+
+    record = {
+        "backend"     : backend,
+        "conn_string" : conn_string if type(conn_string) is str else list(conn_string),
+        "started"     : pd.Timestamp.now().isoformat(),
+        "phases"      : [],
+        "active"      : False
+    }
+
+    with _INSTRUMENT_LOCK:
+        owns_tracing = not tracemalloc.is_tracing()
+        if owns_tracing:
+            tracemalloc.start()
+
+        _PHASE_LOCAL.record = record
+        start = time.perf_counter()
+
+        try:
+            df = collect_data(conn_string, backend = backend, **kwargs)
+        finally:
+            _PHASE_LOCAL.record = None
+            if owns_tracing:
+                tracemalloc.stop()
+
+    del record["active"]
+
+    record["seconds"]  = time.perf_counter() - start
+    record["rows_out"] = len(df) if isinstance(df, pd.DataFrame) else None
+    record["peak_mb"]  = max([phase["peak_mb"] for phase in record["phases"]], default = 0.0)
+
+    with _PHASE_STATS_LOCK:
+        for phase in [*record["phases"], {"phase": "total", **record}]:
+            stats = _PHASE_STATS.setdefault((backend, phase["phase"]), {
+                "calls": 0, "total_seconds": 0.0, "max_seconds": 0.0,
+                "total_rows_out": 0, "max_peak_mb": 0.0
+            })
+            stats["calls"]          += 1
+            stats["total_seconds"]  += phase["seconds"]
+            stats["max_seconds"]     = max(stats["max_seconds"], phase["seconds"])
+            stats["total_rows_out"] += phase["rows_out"] or 0
+            stats["max_peak_mb"]     = max(stats["max_peak_mb"], phase["peak_mb"])
+
+    logger.info(
+        "collect_data: %.3fs, %s rows, %d phases",
+        record["seconds"], record["rows_out"], len(record["phases"]),
+        extra = {"collect_data_record": record}
+    )
+
+    if isinstance(df, pd.DataFrame):
+        df.attrs["collect_data_record"] = record
+
+    return df
+
+
+def collect_data_stats(reset = False):
+    """
+    Returns the phase totals of every collect_data(instrument = True) call in this process.
+
+    Args:
+        reset (bool, optional): Clear the totals after reading them. Defaults to False.
+
+    Returns:
+        DataFrame: One row per backend and phase ("total" is the whole call), with calls, total, mean and max seconds, mean rows out and max peak memory (MB).
+    """
+
+    with _PHASE_STATS_LOCK:
+        stats_list = [
+            {"backend": backend, "phase": phase, **stats}
+            for (backend, phase), stats in _PHASE_STATS.items()
+        ]
+        if reset:
+            _PHASE_STATS.clear()
+
+    columns = ["backend", "phase", "calls", "total_seconds", "mean_seconds", "max_seconds", "mean_rows_out", "max_peak_mb"]
+
+    if len(stats_list) == 0:
+        return pd.DataFrame(columns = columns)
+
+    return pd.DataFrame(stats_list) \
+        .assign(
+            mean_seconds  = lambda x: x["total_seconds"] / x["calls"],
+            mean_rows_out = lambda x: x["total_rows_out"] / x["calls"]
+        ) \
+        [columns]
+
+
+# COMPACT DTYPES ----
+
+def compact_frame(data):
+    """
+    Shrinks a collect_data() frame in memory.
+
+    Text columns with few distinct values (CATEGORY_COLUMNS) become pandas
+    Categorical and the integer id/quantity columns (DOWNCAST_COLUMNS) are
+    downcast to the smallest integer type that holds them. Columns that are
+    missing from `data` are skipped.
+
+    Args:
+        data (DataFrame): A frame returned by collect_data().
+
+    Returns:
+        DataFrame: A compacted copy of `data`.
+    """
+
+    with _phase("compact", rows_in = len(data)) as phase:
+        df = data.copy()
+
+        for col in CATEGORY_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype("category")
+
+        for col in DOWNCAST_COLUMNS:
+            if col in df.columns and pd.api.types.is_integer_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], downcast = "integer")
+
+        phase["rows_out"] = len(df)
+
+    return df
+
+
+def memory_usage_report(before, after):
+    """
+    Compares the deep memory usage of two frames column by column.
+
+    Args:
+        before (DataFrame): The original frame, e.g. collect_data().
+        after (DataFrame): The reduced frame, e.g. collect_data(compact = True).
+
+    Returns:
+        DataFrame: Bytes before and after, the dtype after and the ratio per column, plus a "total" row.
+    """
+
+    bytes_before = before.memory_usage(deep = True)
+
+    report_df = pd.DataFrame({
+        "bytes_before" : bytes_before,
+        "bytes_after"  : after.memory_usage(deep = True),
+        "dtype_after"  : after.dtypes.astype(str)
+    }).reindex(bytes_before.index)
+
+    report_df.loc["total", ["bytes_before", "bytes_after"]] = report_df[["bytes_before", "bytes_after"]].sum()
+
+    report_df["ratio"] = report_df["bytes_after"] / report_df["bytes_before"]
+
+    return report_df
+
+
+# COLLECT DATA IN CHUNKS ----
+def collect_data_chunked(
+    conn_string = "sqlite:///00_database/bike_orders_database.sqlite",
+    chunksize   = 100000,
+    start_date  = None,
+    end_date    = None,
+    columns     = None,
+    filters     = None,
+    profile     = "default"
+):
+    """
+    Streams the combined bike orders data in bounded-size chunks.
+
+    The small bikes and bikeshops tables are read once and kept in memory;
+    orderlines is read `chunksize` rows at a time and each chunk is joined and
+    cleaned exactly like collect_data(). On SQLite the rows stream in
+    orderlines table order even when a date index answers the date range,
+    so concatenating the chunks with pd.concat(..., ignore_index = True)
+    reproduces collect_data(); on other databases the row order is
+    unspecified.
+
+    Args:
+        conn_string (str, optional): A SQLAlchemy connection string to find the database. Defaults to "sqlite:///00_database/bike_orders_database.sqlite".
+        chunksize (int, optional): Number of orderlines rows read per chunk. Defaults to 100000.
+        start_date, end_date, columns, filters, profile: See collect_data().
+
+    Yields:
+        DataFrame: A cleaned chunk with the same columns as collect_data().
+    """
+
+    # Checks
+
+    if (type(chunksize) is not int) or (chunksize < 1):
+        raise ValueError("`chunksize` must be a positive integer.")
+
+    columns, filters = _check_pushdown_args(columns, filters)
+
+    # Body
+
+    conn = get_engine(conn_string, profile = profile).connect()
+
+    try:
+        dimension_dict = _read_dimension_tables(conn)
+
+        # Chunks are joined one at a time, so table order must come from SQLite
+        query, params = _orderlines_query(
+            start_date, end_date, order_by_rowid = conn.dialect.name == "sqlite"
+        )
+
+        chunk_iter = pd.read_sql(
+            sql.text(query),
+            con       = conn,
+            params    = params,
+            chunksize = chunksize
+        )
+
+        for orderlines_df in chunk_iter:
+            yield _join_and_clean(
+                orderlines_df = orderlines_df.drop("index", axis=1, errors="ignore"),
+                bikes_df      = dimension_dict['bikes'],
+                bikeshops_df  = dimension_dict['bikeshops'],
+                columns       = columns,
+                filters       = filters
+            )
+    finally:
+        conn.close()
+
+
+# ASYNC COLLECT DATA ----
+
+# Async engines (sqlalchemy.ext.asyncio) by connection string and profile,
+# and the bounded thread pool collect_data_async() runs pandas work on.
+# SQLite engines do not pool: every aiosqlite connection runs on its own
+# (non-daemon) thread, and a pooled one would keep the interpreter from
+# exiting after asyncio.run(). Pooled connections to other databases belong
+# to the event loop that opened them: use one event loop per process (as an
+# asyncio server does) or call dispose_async_engines() before switching loops.
+_ASYNC_ENGINE_REGISTRY = {}
+
+ASYNC_EXECUTOR_WORKERS = 4
+
+_ASYNC_EXECUTOR = None
+_ASYNC_EXECUTOR_LOCK = threading.Lock()
+
+def get_async_engine(conn_string, profile = "default", pool_size = 5, max_overflow = 10, **kwargs):
+    """
+    Returns the process-wide SQLAlchemy AsyncEngine for a connection string, creating it on first use.
+
+    Plain SQLite connection strings ("sqlite:///...") use the aiosqlite
+    driver without a pool (NullPool): each query opens and closes its own
+    connection and thread, which is cheap for a local file and leaves
+    nothing behind when the event loop ends. Other databases need an async
+    driver in the connection string, e.g. "postgresql+asyncpg://...", and
+    are pooled. Connection profiles work as in get_engine().
+
+    Args:
+        conn_string (str): A SQLAlchemy connection string.
+        profile (str, dict, optional): A key of CONNECTION_PROFILES or a profile dict. Defaults to "default".
+        pool_size (int, optional): Connections kept open in the pool (not SQLite). Defaults to 5.
+        max_overflow (int, optional): Extra connections allowed beyond pool_size (not SQLite). Defaults to 10.
+        **kwargs: Passed to sqlalchemy.ext.asyncio.create_async_engine().
+
+    Returns:
+        sqlalchemy.ext.asyncio.AsyncEngine: The shared engine.
+    """
+
+    try:
+        from sqlalchemy.ext.asyncio import create_async_engine
+    except ImportError:
+        raise ImportError("get_async_engine() requires SQLAlchemy >= 1.4 with greenlet installed.")
+
+    profile_dict = _get_profile(profile)
+
+    url = sql.engine.make_url(conn_string)
+    if url.drivername == "sqlite":
+        url = url.set(drivername = "sqlite+aiosqlite")
+    async_conn_string = url.render_as_string(hide_password = False)
+
+    key = (async_conn_string, json.dumps(profile_dict, sort_keys = True))
+
+    with _ENGINE_REGISTRY_LOCK:
+        engine = _ASYNC_ENGINE_REGISTRY.get(key)
+        if engine is None:
+            # A pooled aiosqlite connection keeps its thread (and the process) alive
+            engine_kwargs = {"poolclass": sql.pool.NullPool}
+            if url.get_backend_name() != "sqlite":
+                engine_kwargs = {
+                    "poolclass"    : sql.pool.AsyncAdaptedQueuePool,
+                    "pool_size"    : pool_size,
+                    "max_overflow" : max_overflow
+                }
+            engine_kwargs.update(kwargs)
+
+            engine = create_async_engine(
+                _profile_conn_string(async_conn_string, profile_dict),
+                **engine_kwargs
+            )
+            _add_pragmas(engine.sync_engine, profile_dict)
+
+            _ASYNC_ENGINE_REGISTRY[key] = engine
+
+    return engine
+
+
+async def dispose_async_engines():
+    """Closes the pooled connections of every async engine and empties the registry."""
+
+    with _ENGINE_REGISTRY_LOCK:
+        engine_list = list(_ASYNC_ENGINE_REGISTRY.values())
+        _ASYNC_ENGINE_REGISTRY.clear()
+
+    for engine in engine_list:
+        await engine.dispose()
+
+
+async def collect_data_async(
+    conn_string = "sqlite:///00_database/bike_orders_database.sqlite",
+    start_date  = None,
+    end_date    = None,
+    columns     = None,
+    filters     = None,
+    compact     = False,
+    profile     = "default",
+    use_wrangled = True,
+    executor    = None
+):
+    """
+    Collects and combines the bike orders data without blocking the event loop.
+
+    The asyncio counterpart of collect_data() with backend = "pandas". The
+    three tables are read concurrently on their own connections of an
+    async engine (see get_async_engine()); while the database works, the
+    event loop is free to serve other requests. Building the data frames,
+    the join and the cleaning run on a bounded thread pool, so many
+    concurrent calls share ASYNC_EXECUTOR_WORKERS threads instead of each
+    holding a thread for the whole query.
+
+    Args:
+        conn_string (str, optional): A SQLAlchemy connection string; "sqlite:///" uses aiosqlite. Defaults to "sqlite:///00_database/bike_orders_database.sqlite".
+        start_date, end_date, columns, filters, compact, profile, use_wrangled: See collect_data().
+        executor (concurrent.futures.Executor, optional): Where the pandas work runs. Defaults to None (a shared pool of ASYNC_EXECUTOR_WORKERS threads).
+
+    Returns:
+        DataFrame: The same data frame as collect_data().
+    """
+
+    # Checks
+
+    columns, filters = _check_pushdown_args(columns, filters)
+
+    # Body
+
+    loop     = asyncio.get_running_loop()
+    engine   = get_async_engine(conn_string, profile = profile)
+    executor = executor or _get_async_executor()
+
+    # 1.0 Materialized table: one query
+
+    if use_wrangled:
+        async with engine.connect() as conn:
+            has_wrangled = await conn.run_sync(
+                lambda sync_conn: _wrangled_is_current(
+                    lambda query: sync_conn.execute(sql.text(query)).fetchall()
+                )
+            )
+
+        if has_wrangled:
+            query, params = _build_wrangled_query(start_date, end_date, columns, filters)
+            rows, keys = await _fetch_rows_async(engine, query, params)
+
+            df = await loop.run_in_executor(
+                executor, _wrangled_frame_from_rows, rows, keys, columns, compact
+            )
+
+            return df
+
+    # 2.0 Concurrent table reads
+
+    query_dict = {
+        'bikes'      : ("SELECT * FROM bikes", None),
+        'bikeshops'  : ("SELECT * FROM bikeshops", None),
+        'orderlines' : _orderlines_query(start_date, end_date, row_order = engine.dialect.name == "sqlite")
+    }
+
+    result_list = await asyncio.gather(*[
+        _fetch_rows_async(engine, query, params)
+        for query, params in query_dict.values()
+    ])
+
+    # 3.0 Frames, join & cleaning off the event loop
+
+    df = await loop.run_in_executor(
+        executor, _join_and_clean_rows,
+        dict(zip(query_dict, result_list)), columns, filters, compact
+    )
+
+    return df
+
+
+def _get_async_executor():
+    global _ASYNC_EXECUTOR
+
+    with _ASYNC_EXECUTOR_LOCK:
+        if _ASYNC_EXECUTOR is None:
+            _ASYNC_EXECUTOR = ThreadPoolExecutor(
+                max_workers        = ASYNC_EXECUTOR_WORKERS,
+                thread_name_prefix = "collect_data_async"
+            )
+
+    return _ASYNC_EXECUTOR
+
+
+async def _fetch_rows_async(engine, query, params = None):
+    """Runs one query on its own pooled async connection; returns the rows and column names."""
+
+    async with engine.connect() as conn:
+        result = await conn.execute(sql.text(query), params or {})
+        return result.fetchall(), list(result.keys())
+
+
+def _frame_from_rows(rows, keys):
+    """Builds a data frame from fetched rows the way pd.read_sql() does."""
+
+    # Tables written with DataFrame.to_sql() defaults carry a pandas "index" column
+    return pd.DataFrame.from_records(rows, columns = keys, coerce_float = True) \
+        .drop("index", axis = 1, errors = "ignore")
+
+
+def _join_and_clean_rows(result_dict, columns, filters, compact = False):
+    """Executor worker: frames, dimension splits, join and cleaning for collect_data_async()."""
+
+    data_dict = {table: _frame_from_rows(rows, keys) for table, (rows, keys) in result_dict.items()}
+    data_dict.update(_split_dimension_tables(data_dict['bikes'], data_dict['bikeshops']))
+
+    df = _join_and_clean(
+        orderlines_df = data_dict['orderlines'],
+        bikes_df      = data_dict['bikes'],
+        bikeshops_df  = data_dict['bikeshops'],
+        columns       = columns,
+        filters       = filters
+    )
+
+    return compact_frame(df) if compact else df
+
+
+def _wrangled_frame_from_rows(rows, keys, columns, compact = False):
+    """Executor worker: the WRANGLED_TABLE rows as a collect_data() frame, in table order."""
+
+    df = _frame_from_rows(rows, keys)
+
+    if 'order_date' in columns:
+        df['order_date'] = pd.to_datetime(df['order_date'])
+
+    df = df \
+        .sort_values('row_order', kind = 'mergesort') \
+        .drop('row_order', axis = 1) \
+        .reset_index(drop = True)
+
+    return compact_frame(df) if compact else df
+
+
+# STAR SCHEMA ----
+
+# Output columns that come from a dimension table, by the fact table key
+# that looks them up
+STAR_DIMENSIONS = {
+    'product_id'  : ['model', 'price', 'category_1', 'category_2', 'frame_material'],
+    'customer_id' : ['bikeshop_name', 'city', 'state']
+}
+
+STAR_FACT_COLUMNS = ['order_id', 'order_line', 'order_date', 'quantity', 'product_id', 'customer_id']
+
+class StarFrame:
+    """
+    The bike orders data kept as a star schema: the orderlines fact table
+    with integer product_id/customer_id keys, plus the small bikes and
+    bikeshops dimension tables.
+
+    Dimension columns (model, category_1, bikeshop_name, ...) and
+    total_price are only built when asked for, with a vectorized key
+    lookup, instead of repeating the strings on every order line. Create
+    one with collect_star().
+
+        star = collect_star()
+        star["category_2"]                                    # one Series
+        star.materialize(["order_date", "category_2", "total_price"])
+
+    Attributes:
+        fact (DataFrame): order_id, order_line, order_date, quantity, product_id and customer_id, in orderlines table order.
+        dimensions (dict): Maps the fact key columns to their dimension table, indexed by the key.
+    """
+
+    def __init__(self, fact, dimensions):
+        self.fact       = fact
+        self.dimensions = dimensions
+
+    def __len__(self):
+        return len(self.fact)
+
+    def __repr__(self):
+        return f"<StarFrame: {len(self.fact)} order lines, {self.memory_usage() / 1e6:.1f} MB>"
+
+    @property
+    def columns(self):
+        """The collect_data() output columns that can be materialized."""
+        return list(OUTPUT_COLUMNS)
+
+    def __getitem__(self, key):
+        if type(key) is list:
+            return self.materialize(key)
+        return self.materialize([key])[key]
+
+    def materialize(self, columns = None, compact = False):
+        """
+        Builds collect_data() output columns from the fact and dimension tables.
+
+        Args:
+            columns (list, optional): Output columns to build. Defaults to None (all columns).
+            compact (bool, optional): Return text columns as pandas Categorical (built straight from the dimension codes) and downcast the integer columns, as compact_frame() does. Defaults to False.
+
+        Returns:
+            DataFrame: The same frame as collect_data(columns = columns, compact = compact).
+        """
+
+        columns, _ = _check_pushdown_args(columns, None)
+
+        data_dict = {}
+        position_dict = {}
+
+        for col in columns:
+
+            if col in self.fact.columns:
+                data_dict[col] = self.fact[col]
+                continue
+
+            if col == 'total_price':
+                data_dict[col] = self.fact['quantity'] * self._lookup('product_id', 'price', position_dict)
+                continue
+
+            key = [key for key, dim_columns in STAR_DIMENSIONS.items() if col in dim_columns][0]
+            data_dict[col] = self._lookup(key, col, position_dict, categorical = compact)
+
+        df = pd.DataFrame(data_dict, index = self.fact.index)[columns]
+
+        return compact_frame(df) if compact else df
+
+    def memory_usage(self):
+        """Bytes used by the fact and dimension tables (pandas deep memory usage)."""
+
+        return int(
+            self.fact.memory_usage(deep = True).sum()
+            + sum(dim_df.memory_usage(deep = True).sum() for dim_df in self.dimensions.values())
+        )
+
+    def _lookup(self, key, col, position_dict, categorical = False):
+        """
+        Looks up one dimension column for every fact row.
+
+        The positions of the fact keys in the dimension index are computed
+        once per key and reused (via `position_dict`) for the other columns
+        of the same dimension. Keys missing from the dimension give NaN.
+        """
+
+        dim_df = self.dimensions[key]
+
+        if key not in position_dict:
+            position_dict[key] = dim_df.index.get_indexer(self.fact[key])
+        positions = position_dict[key]
+
+        if categorical and not pd.api.types.is_numeric_dtype(dim_df[col]):
+            dim_codes, categories = pd.factorize(dim_df[col], sort = True)
+            codes = np.where(positions >= 0, dim_codes[positions], -1)
+            values = pd.Categorical.from_codes(codes, categories = categories) \
+                .remove_unused_categories()
+        else:
+            values = pd.api.extensions.take(
+                dim_df[col].to_numpy(), positions, allow_fill = True
+            )
+
+        return pd.Series(values, index = self.fact.index, name = col)
+
+
+def collect_star(
+    conn_string = "sqlite:///00_database/bike_orders_database.sqlite",
+    start_date  = None,
+    end_date    = None,
+    compact     = False,
+    profile     = "default"
+):
+    """
+    Collects the bike orders data as a StarFrame instead of one joined frame.
+
+    Only the orderlines columns are read per order line; bikes and
+    bikeshops are read once, split (see _split_dimension_tables()) and kept
+    as small dimension tables. On long histories this uses several times
+    less memory than collect_data(), whose text columns repeat the product
+    and customer strings on every row.
+
+    Args:
+        conn_string (str, optional): A SQLAlchemy connection string to find the database. Defaults to "sqlite:///00_database/bike_orders_database.sqlite".
+        start_date, end_date, profile: See collect_data().
+        compact (bool, optional): Downcast the integer fact columns (ids, keys and quantity). Defaults to False.
+
+    Returns:
+        StarFrame: The fact and dimension tables.
+    """
+
+    conn = get_engine(conn_string, profile = profile).connect()
+
+    try:
+        dimension_dict = _read_dimension_tables(conn)
+
+        query, params = _orderlines_query(start_date, end_date, row_order = conn.dialect.name == "sqlite")
+
+        orderlines_df, _ = _read_table(conn, query, params)
+    finally:
+        conn.close()
+
+    if 'row_order' in orderlines_df.columns:
+        orderlines_df = orderlines_df \
+            .sort_values('row_order', kind = 'mergesort') \
+            .reset_index(drop = True)
+
+    # Fact table
+    fact_df = orderlines_df.rename(columns = lambda col: col.replace(".", "_"))[STAR_FACT_COLUMNS]
+    fact_df['order_date'] = pd.to_datetime(fact_df['order_date'])
+
+    if compact:
+        for col in ['order_id', 'order_line', 'quantity', 'product_id', 'customer_id']:
+            fact_df[col] = pd.to_numeric(fact_df[col], downcast = "integer")
+
+    # Dimension tables, indexed by the fact keys
+    dimensions = {
+        'product_id'  : dimension_dict['bikes'] \
+            .rename(columns = lambda col: col.replace(".", "_")) \
+            .set_index('bike_id')[STAR_DIMENSIONS['product_id']],
+        'customer_id' : dimension_dict['bikeshops'] \
+            .rename(columns = lambda col: col.replace(".", "_")) \
+            .set_index('bikeshop_id')[STAR_DIMENSIONS['customer_id']]
+    }
+
+    return StarFrame(fact_df, dimensions)
+
+
+# INCREMENTAL SNAPSHOT ----
+
+# Metadata file kept inside a snapshot directory (Parquet readers skip
+# files starting with "_")
+SNAPSHOT_METADATA = "_snapshot.json"
+
+def refresh_snapshot(
+    snapshot_path,
+    conn_string = "sqlite:///00_database/bike_orders_database.sqlite",
+    backend     = "pandas",
+    profile     = "default"
+):
+    """
+    Brings a local Parquet snapshot of collect_data() up to date.
+
+    The snapshot is a directory of Parquet part files plus a metadata file
+    (SNAPSHOT_METADATA) holding the watermark (the highest `order.id`
+    already materialized) and the order date range of every part. Only
+    orderlines above the watermark are fetched, joined and cleaned, and they
+    are written as one new part file; existing parts are never read or
+    rewritten, so a refresh costs as much as the new orders rather than the
+    whole history. This relies on order ids increasing over time and on
+    existing orders never changing; delete the directory to rebuild the
+    snapshot from scratch. Read it with read_snapshot().
+
+    Args:
+        snapshot_path (str): Path to the snapshot directory. Created if missing.
+        conn_string (str, optional): A SQLAlchemy connection string to find the database. Defaults to "sqlite:///00_database/bike_orders_database.sqlite".
+        backend (str, optional): Backend used to clean the new rows, see collect_data(). Defaults to "pandas".
+        profile (str, dict, optional): Connection profile, see CONNECTION_PROFILES. Defaults to "default".
+
+    Returns:
+        dict: The snapshot metadata: watermark ("order_id", "order_date") and "parts".
+    """
+
+    metadata = _read_snapshot_metadata(snapshot_path)
+
+    collect_func = _collect_data_sql if backend == "sql" else _collect_data_pandas
+
+    conn = get_engine(conn_string, profile = profile).connect()
+
+    try:
+        new_df = collect_func(conn, min_order_id = metadata["order_id"])
+    finally:
+        conn.close()
+
+    if len(new_df) == 0:
+        return metadata
+
+    os.makedirs(snapshot_path, exist_ok = True)
+
+    # Named after the first order id the part can hold, so a refresh that
+    # stops before the metadata is updated rewrites the same part next time
+    # instead of adding a duplicate
+    part_name = f"part-{(metadata['order_id'] or 0) + 1:012d}.parquet"
+    part_path = os.path.join(snapshot_path, part_name)
+
+    tmp_path = part_path + ".tmp"
+    new_df.to_parquet(tmp_path)
+    os.replace(tmp_path, part_path)
+
+    part_list = [part for part in metadata["parts"] if part["file"] != part_name]
+    part_list.append({
+        "file"     : part_name,
+        "rows"     : len(new_df),
+        "min_date" : str(new_df['order_date'].min()),
+        "max_date" : str(new_df['order_date'].max())
+    })
+
+    metadata = {
+        "order_id"   : int(new_df['order_id'].max()),
+        "order_date" : str(max(pd.Timestamp(part["max_date"]) for part in part_list)),
+        "parts"      : part_list
+    }
+
+    meta_path = os.path.join(snapshot_path, SNAPSHOT_METADATA)
+    with open(meta_path + ".tmp", "w") as f:
+        json.dump(metadata, f)
+    os.replace(meta_path + ".tmp", meta_path)
+
+    return metadata
+
+
+def read_snapshot(snapshot_path, start_date = None, end_date = None, columns = None, filters = None):
+    """
+    Reads a snapshot written by refresh_snapshot().
+
+    Parts whose order dates fall outside `start_date`/`end_date` are skipped
+    without being opened, and only the needed columns are read from the
+    others.
+
+    Args:
+        snapshot_path (str): Path to the snapshot directory.
+        start_date, end_date, columns, filters: As in collect_data().
+
+    Returns:
+        DataFrame: The snapshot rows in orderlines table order.
+    """
+
+    columns, filters = _check_pushdown_args(columns, filters)
+
+    metadata = _read_snapshot_metadata(snapshot_path)
+
+    read_columns = [
+        col for col in OUTPUT_COLUMNS
+        if col in columns or col in filters or (col == 'order_date' and (start_date, end_date) != (None, None))
+    ]
+
+    df_list = []
+    for part in metadata["parts"]:
+        if start_date is not None and pd.Timestamp(part["max_date"]) < pd.Timestamp(start_date):
+            continue
+        if end_date is not None and pd.Timestamp(part["min_date"]) >= pd.Timestamp(end_date).normalize() + pd.Timedelta(days = 1):
+            continue
+        df_list.append(
+            pd.read_parquet(os.path.join(snapshot_path, part["file"]), columns = read_columns)
+        )
+
+    if len(df_list) == 0:
+        df = pd.DataFrame(columns = read_columns)
+    else:
+        df = pd.concat(df_list, ignore_index = True)
+
+    return _filter_frame(df, start_date, end_date, columns, filters)
+
+
+def _read_snapshot_metadata(snapshot_path):
+    """The snapshot's metadata, or an empty snapshot's if it does not exist yet."""
+
+    if os.path.isfile(snapshot_path):
+        raise ValueError(
+            f"`{snapshot_path}` is a single-file snapshot from an older version. "
+            "Delete it (and its .json file) to rebuild it as a snapshot directory."
+        )
+
+    meta_path = os.path.join(snapshot_path, SNAPSHOT_METADATA)
+
+    if not os.path.exists(meta_path):
+        return {"order_id": None, "order_date": None, "parts": []}
+
+    with open(meta_path) as f:
+        return json.load(f)
+
+
+# ON-DISK CACHE ----
+
+def database_fingerprint(conn_string):
+    """
+    Returns a cheap fingerprint that changes whenever the database changes.
+
+    File-based SQLite uses the size and modification time of the database
+    file (and its -wal file, if any). Other databases use count(*) and, where
+    available, max(rowid) for each of the three tables.
+
+    Args:
+        conn_string (str): A SQLAlchemy connection string.
+
+    Returns:
+        dict: A JSON-serializable fingerprint.
+    """
+
+    url = sql.engine.make_url(conn_string)
+
+    if url.get_backend_name() == "sqlite" and url.database not in [None, "", ":memory:"]:
+        fingerprint = {}
+        for path in [url.database, url.database + "-wal"]:
+            if os.path.exists(path):
+                stat = os.stat(path)
+                fingerprint[os.path.basename(path)] = [stat.st_size, stat.st_mtime_ns]
+        return fingerprint
+
+    max_rowid = "max(rowid)" if url.get_backend_name() == "sqlite" else "NULL"
+
+    fingerprint = {}
+    with get_engine(conn_string).connect() as conn:
+        for table in TABLE_NAMES:
+            row = conn.execute(
+                sql.text(f"SELECT count(*), {max_rowid} FROM {table}")
+            ).fetchone()
+            fingerprint[table] = [row[0], row[1]]
+
+    return fingerprint
+
+
+def _cache_lookup(cache_dir, conn_string, **params):
+    """
+    Returns the cache file path and, on a miss, the current fingerprint.
+
+    A fingerprint of None means the cached file is current and can be read.
+    """
+
+    with _phase("cache_lookup"):
+        return _cache_lookup_path(cache_dir, conn_string, **params)
+
+
+def _cache_lookup_path(cache_dir, conn_string, **params):
+    key_dict = {"conn_string": conn_string, **params}
+    key = hashlib.sha1(
+        json.dumps(key_dict, sort_keys = True, default = str).encode("utf-8")
+    ).hexdigest()[:16]
+
+    cache_path = os.path.join(cache_dir, f"collect_data_{key}.parquet")
+    meta_path  = cache_path + ".json"
+
+    fingerprint = database_fingerprint(conn_string)
+
+    if os.path.exists(cache_path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            if json.load(f) == fingerprint:
+                return cache_path, None
+
+    return cache_path, fingerprint
+
+
+def _cache_store(df, cache_path, fingerprint):
+    """Writes the result and its fingerprint (or watermark) next to each other."""
+
+    with _phase("cache_store", rows_in = len(df)):
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok = True)
+
+        # Write to a temporary name first so readers never see a partial file
+        tmp_path = cache_path + ".tmp"
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, cache_path)
+
+        with open(cache_path + ".json", "w") as f:
+            json.dump(fingerprint, f)
+
+
+# IN-MEMORY RESULT CACHE ----
+
+# collect_data(memory_cache = True) results, least recently used first.
+# Each entry is a dict with the frame, its size, expiry time, connection
+# string(s) and, for file-based SQLite, the database fingerprint it was read at.
+_RESULT_CACHE = OrderedDict()
+_RESULT_CACHE_LOCK = threading.Lock()
+
+_RESULT_CACHE_CONFIG = {
+    "max_bytes" : 512 * 1024 ** 2,  # 512 MB
+    "ttl"       : 300               # seconds
+}
+
+_RESULT_CACHE_STATS = {
+    "hits" : 0, "misses" : 0, "evictions" : 0, "expirations" : 0, "invalidations" : 0
+}
+
+def configure_result_cache(max_bytes = None, ttl = None):
+    """
+    Sets the limits of the in-memory result cache used by collect_data(memory_cache = True).
+
+    Args:
+        max_bytes (int, optional): Total size (pandas deep memory usage) the cached frames may use. Least recently used entries are evicted beyond it; a single result larger than this is not cached. Defaults to None (unchanged, initially 512 MB).
+        ttl (int, float, optional): Seconds an entry stays valid after it was stored. Defaults to None (unchanged, initially 300).
+
+    Returns:
+        dict: The new settings.
+    """
+
+    # Checks
+
+    if max_bytes is not None and ((type(max_bytes) is not int) or (max_bytes < 0)):
+        raise ValueError("`max_bytes` must be a non-negative integer.")
+
+    if ttl is not None and ((type(ttl) not in [int, float]) or (ttl <= 0)):
+        raise ValueError("`ttl` must be a positive number of seconds.")
+
+    # Body
+
+    with _RESULT_CACHE_LOCK:
+        if max_bytes is not None:
+            _RESULT_CACHE_CONFIG["max_bytes"] = max_bytes
+        if ttl is not None:
+            _RESULT_CACHE_CONFIG["ttl"] = ttl
+
+        _result_cache_evict()
+
+        return dict(_RESULT_CACHE_CONFIG)
+
+
+def invalidate_result_cache(conn_string = None):
+    """
+    Drops cached collect_data() results.
+
+    load_tables() and refresh_wrangled_table() call this for the database
+    they write to. Call it after changing a database any other way, e.g.
+    from another process writing to a non-SQLite database (SQLite files are
+    also checked for changes on every cache hit).
+
+    Args:
+        conn_string (str, optional): Only drop results read from this database (including sharded reads that used it). Defaults to None (drop everything).
+
+    Returns:
+        int: The number of entries dropped.
+    """
+
+    with _RESULT_CACHE_LOCK:
+        keys = [
+            key for key, entry in _RESULT_CACHE.items()
+            if conn_string is None or conn_string in entry["conn_strings"]
+        ]
+
+        for key in keys:
+            del _RESULT_CACHE[key]
+
+        _RESULT_CACHE_STATS["invalidations"] += len(keys)
+
+    return len(keys)
+
+
+def result_cache_info():
+    """
+    Returns the in-memory result cache counters and current size.
+
+    Returns:
+        dict: hits, misses, evictions (LRU, over max_bytes), expirations (TTL or changed database file), invalidations, entries, bytes, max_bytes and ttl.
+    """
+
+    with _RESULT_CACHE_LOCK:
+        return {
+            **_RESULT_CACHE_STATS,
+            "entries" : len(_RESULT_CACHE),
+            "bytes"   : sum(entry["bytes"] for entry in _RESULT_CACHE.values()),
+            **_RESULT_CACHE_CONFIG
+        }
+
+
+def _result_cache_key(conn_string, **params):
+    return json.dumps({"conn_string": conn_string, **params}, sort_keys = True, default = str)
+
+
+def _result_cache_fingerprints(conn_strings):
+    """database_fingerprint() of the file-based SQLite databases (a stat() each); others are left to the TTL."""
+
+    fingerprint_dict = {}
+    for conn_string in conn_strings:
+        url = sql.engine.make_url(conn_string)
+        if url.get_backend_name() == "sqlite" and url.database not in [None, "", ":memory:"]:
+            fingerprint_dict[conn_string] = database_fingerprint(conn_string)
+
+    return fingerprint_dict
+
+
+def _result_cache_get(key):
+    """Returns a copy of a valid cached result, or None (a miss)."""
+
+    with _RESULT_CACHE_LOCK:
+        entry = _RESULT_CACHE.get(key)
+
+        if entry is None:
+            _RESULT_CACHE_STATS["misses"] += 1
+            return None
+
+        if time.monotonic() > entry["expires"] \
+                or _result_cache_fingerprints(entry["conn_strings"]) != entry["fingerprints"]:
+            del _RESULT_CACHE[key]
+            _RESULT_CACHE_STATS["expirations"] += 1
+            _RESULT_CACHE_STATS["misses"] += 1
+            return None
+
+        _RESULT_CACHE.move_to_end(key)
+        _RESULT_CACHE_STATS["hits"] += 1
+
+        return entry["df"].copy()
+
+
+def _result_cache_put(key, conn_strings, fingerprints, df):
+    """
+    Stores a private copy of a result, then evicts down to max_bytes.
+
+    `fingerprints` must be taken before the result was read (see
+    _result_cache_fingerprints()), as _cache_lookup() does for the on-disk
+    cache: a write during the read then makes the entry stale on its first
+    lookup instead of being cached as current.
+    """
+
+    entry = {
+        "df"           : df.copy(),
+        "bytes"        : int(df.memory_usage(deep = True).sum()),
+        "conn_strings" : conn_strings,
+        "fingerprints" : fingerprints
+    }
+
+    with _RESULT_CACHE_LOCK:
+        if entry["bytes"] > _RESULT_CACHE_CONFIG["max_bytes"]:
+            return
+
+        entry["expires"] = time.monotonic() + _RESULT_CACHE_CONFIG["ttl"]
+
+        _RESULT_CACHE[key] = entry
+        _RESULT_CACHE.move_to_end(key)
+
+        _result_cache_evict()
+
+
+def _result_cache_evict():
+    """Drops least recently used entries until the cache fits max_bytes. Caller holds the lock."""
+
+    total = sum(entry["bytes"] for entry in _RESULT_CACHE.values())
+
+    while total > _RESULT_CACHE_CONFIG["max_bytes"] and len(_RESULT_CACHE) > 0:
+        _, entry = _RESULT_CACHE.popitem(last = False)
+        total -= entry["bytes"]
+        _RESULT_CACHE_STATS["evictions"] += 1
+
+
+# BULK LOADING ----
+
+def load_tables(
+    table_dict,
+    conn_string = "sqlite:///00_database/bike_orders_database.sqlite",
+    if_exists   = "append",
+    batch_size  = 10000
+):
+    """
+    Bulk-loads data frames into the orders database in a single transaction.
+
+    Each table is created (if missing) with the column types and unique key
+    in TABLE_SCHEMAS; only the schema columns are written, so the pandas
+    "index" column and spreadsheet row numbers (e.g. "Unnamed: 0") are
+    skipped. Rows are converted and sent with DBAPI executemany() in
+    batches of `batch_size`, all inside one transaction (table drops and
+    creates included): either every table loads or nothing changes. If the database has the materialized
+    WRANGLED_TABLE, it is refreshed in the same transaction (new rows only
+    after an append of orderlines, rebuilt otherwise), see
+    refresh_wrangled_table().
+
+    Args:
+        table_dict (dict): Maps table names in TABLE_SCHEMAS ("bikes", "bikeshops", "orderlines") to data frames.
+        conn_string (str, optional): A SQLAlchemy connection string for a SQLite database. Defaults to "sqlite:///00_database/bike_orders_database.sqlite".
+        if_exists (str, optional): One of:
+
+            - "append": Insert the rows; a duplicate key raises an error.
+            - "upsert": Insert new keys and update the rows of existing keys.
+            - "replace": Drop and recreate the table first.
+
+            Defaults to "append".
+        batch_size (int, optional): Rows per executemany() call. Defaults to 10000.
+
+    Returns:
+        dict: Maps table names to the number of rows written.
+    """
+
+    # Checks
+
+    if sql.engine.make_url(conn_string).get_backend_name() != "sqlite":
+        raise ValueError("`load_tables()` only supports SQLite databases.")
+
+    if if_exists not in ["append", "upsert", "replace"]:
+        raise ValueError("`if_exists` must be one of 'append', 'upsert' or 'replace'.")
+
+    if (type(batch_size) is not int) or (batch_size < 1):
+        raise ValueError("`batch_size` must be a positive integer.")
+
+    unknown = [table for table in table_dict if table not in TABLE_SCHEMAS]
+    if len(unknown) > 0:
+        raise ValueError(f"Unknown table(s): {unknown}. Must be in {list(TABLE_SCHEMAS)}.")
+
+    for table, data in table_dict.items():
+        missing = [col for col in TABLE_SCHEMAS[table]['columns'] if col not in data.columns]
+        if len(missing) > 0:
+            raise ValueError(f"`{table}` is missing column(s): {missing}.")
+
+    # Body
+
+    rows_dict = {}
+
+    with get_engine(conn_string).begin() as conn:
+        _begin_sqlite(conn)
+
+        for table, data in table_dict.items():
+
+            schema  = TABLE_SCHEMAS[table]
+            columns = list(schema['columns'])
+            quoted  = [f'"{col}"' for col in columns]
+            key_cols = [f'"{col}"' for col in schema['key']]
+            key     = ", ".join(key_cols)
+
+            # 1.0 Table & unique key
+
+            if if_exists == "replace":
+                conn.exec_driver_sql(f"DROP TABLE IF EXISTS {table}")
+
+            column_defs = ", ".join(
+                f'"{col}" {col_type}' for col, col_type in schema['columns'].items()
+            )
+            conn.exec_driver_sql(f"CREATE TABLE IF NOT EXISTS {table} ({column_defs})")
+            conn.exec_driver_sql(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{table}_key ON {table} ({key})")
+
+            # 2.0 Insert statement
+
+            insert_sql = f"INSERT INTO {table} ({', '.join(quoted)}) VALUES ({', '.join('?' * len(columns))})"
+
+            if if_exists == "upsert":
+                updates = ", ".join(
+                    f"{col} = excluded.{col}" for col in quoted if col not in key_cols
+                )
+                insert_sql = insert_sql + f" ON CONFLICT ({key}) DO UPDATE SET {updates}"
+
+            # 3.0 Batched executemany (one batch of tuples in memory at a time)
+
+            for start in range(0, len(data), batch_size):
+                conn.exec_driver_sql(
+                    insert_sql,
+                    _to_records(data[columns].iloc[start:start + batch_size])
+                )
+
+            rows_dict[table] = len(data)
+
+        # 4.0 Keep the materialized table in step, in the same transaction
+
+        if sql.inspect(conn).has_table(WRANGLED_TABLE):
+            _refresh_wrangled_table(conn)
+
+    invalidate_result_cache(conn_string)
+
+    return rows_dict
+
+
+def _begin_sqlite(conn):
+    """
+    Opens the transaction of an engine.begin() block on SQLite explicitly.
+
+    pysqlite only sends BEGIN before INSERT, UPDATE and DELETE, so DROP and
+    CREATE statements before the first of them would commit on their own and
+    survive a rollback.
+    """
+
+    conn.exec_driver_sql("BEGIN")
+
+
+def _to_records(data):
+    """
+    Converts a data frame to a list of plain-Python tuples for executemany().
+
+    Datetimes are written in the "YYYY-MM-DD HH:MM:SS.ffffff" text format
+    DataFrame.to_sql() uses, so date-range filters keep working; missing
+    values become NULL.
+    """
+
+    df = data.copy()
+
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].dt.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+    df = df.astype(object).where(df.notna(), None)
+
+    return list(df.itertuples(index = False, name = None))
+
+
+# DATABASE MAINTENANCE ----
+
+def optimize_database(
+    conn_string = "sqlite:///00_database/bike_orders_database.sqlite",
+    vacuum      = False
+):
+    """
+    Creates the indexes collect_data() relies on, refreshes the planner statistics and optionally compacts the file.
+
+    Creates the indexes in INDEX_DICT (if missing) on the join keys,
+    "order.date" and "order.id", then runs ANALYZE and, if requested, VACUUM.
+    The query plans of the standard collect_data() queries are captured
+    before and after so the effect can be checked.
+
+    Args:
+        conn_string (str, optional): A SQLAlchemy connection string for a SQLite database. Defaults to "sqlite:///00_database/bike_orders_database.sqlite".
+        vacuum (bool, optional): Rebuild the database file to reclaim free pages. Defaults to False.
+
+    Returns:
+        DataFrame: One row per standard query with its plan before and after.
+    """
+
+    # Checks
+
+    if sql.engine.make_url(conn_string).get_backend_name() != "sqlite":
+        raise ValueError("`optimize_database()` only supports SQLite databases.")
+
+    # Body
+
+    engine = get_engine(conn_string)
+
+    plans_before = explain_collect_data(conn_string)
+
+    with engine.begin() as conn:
+        for index_name, (table, column) in INDEX_DICT.items():
+            conn.execute(sql.text(
+                f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({column})"
+            ))
+        conn.execute(sql.text("ANALYZE"))
+
+    # VACUUM cannot run inside a transaction
+    if vacuum:
+        with engine.connect().execution_options(isolation_level = "AUTOCOMMIT") as conn:
+            conn.execute(sql.text("VACUUM"))
+
+    plans_after = explain_collect_data(conn_string)
+
+    return pd.DataFrame({
+        "query"  : list(plans_before.keys()),
+        "before" : list(plans_before.values()),
+        "after"  : [plans_after[key] for key in plans_before]
+    })
+
+
+def refresh_wrangled_table(
+    conn_string = "sqlite:///00_database/bike_orders_database.sqlite",
+    rebuild     = False
+):
+    """
+    Builds or refreshes the materialized WRANGLED_TABLE.
+
+    The table has the exact columns collect_data() returns (plus row_order,
+    the source orderlines rowid) and is indexed on order_date and order_id.
+    It is filled with the SQL backend's join and cleaning, run entirely
+    inside the database. Alongside it, WRANGLED_SOURCE_TABLE records the
+    count(*) and max(rowid) of orderlines, bikes and bikeshops, and triggers
+    count every row updated or deleted in them afterwards.
+
+    When the only change since the last refresh is new orderlines
+    (appended rows, nothing updated or deleted), only those rows are
+    inserted; any other change, including a source table that was dropped
+    and recreated, rebuilds the table. collect_data() reads the
+    table only while it is current and otherwise falls back to the live
+    join, so a stale table is never returned. load_tables() refreshes it in
+    its own transaction.
+
+    Args:
+        conn_string (str, optional): A SQLAlchemy connection string for a SQLite database. Defaults to "sqlite:///00_database/bike_orders_database.sqlite".
+        rebuild (bool, optional): Drop and rebuild the table from scratch. Defaults to False.
+
+    Returns:
+        int: The number of rows inserted.
+    """
+
+    # Checks
+
+    if sql.engine.make_url(conn_string).get_backend_name() != "sqlite":
+        raise ValueError("`refresh_wrangled_table()` only supports SQLite databases.")
+
+    # Body
+
+    with get_engine(conn_string).begin() as conn:
+        _begin_sqlite(conn)
+        n_rows = _refresh_wrangled_table(conn, rebuild = rebuild)
+
+    invalidate_result_cache(conn_string)
+
+    return n_rows
+
+
+def _refresh_wrangled_table(conn, rebuild = False):
+    """refresh_wrangled_table() inside the caller's transaction; returns the rows inserted."""
+
+    if rebuild:
+        conn.execute(sql.text(f"DROP TABLE IF EXISTS {WRANGLED_TABLE}"))
+        conn.execute(sql.text(f"DROP TABLE IF EXISTS {WRANGLED_SOURCE_TABLE}"))
+
+    conn.execute(sql.text(WRANGLED_TABLE_SQL))
+    conn.execute(sql.text(WRANGLED_SOURCE_SQL))
+
+    for index_name, (table, column) in WRANGLED_INDEX_DICT.items():
+        conn.execute(sql.text(
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({column})"
+        ))
+
+    # A source table that was dropped and recreated lost its triggers, and
+    # may have changed without changing count(*) or max(rowid)
+    n_triggers = conn.execute(sql.text(
+        "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name IN (" +
+        ", ".join(f"'{name}'" for name in WRANGLED_TRIGGERS) + ")"
+    )).scalar()
+
+    for trigger_name, (table, event) in WRANGLED_TRIGGERS.items():
+        conn.execute(sql.text(
+            f"CREATE TRIGGER IF NOT EXISTS {trigger_name} AFTER {event} ON {table} BEGIN "
+            f"UPDATE {WRANGLED_SOURCE_TABLE} SET changes = changes + 1 WHERE table_name = '{table}'; END"
+        ))
+
+    # 1.0 What changed since the last refresh
+
+    stored_dict = {
+        row[0]: row[1:]
+        for row in conn.execute(sql.text(
+            f"SELECT table_name, row_count, max_rowid, changes FROM {WRANGLED_SOURCE_TABLE}"
+        ))
+    }
+
+    live_dict = {
+        row[0]: row[1:]
+        for row in conn.execute(sql.text(_source_watermark_query()))
+    }
+
+    # Appended orderlines only: the dimension tables are unchanged, nothing
+    # was updated or deleted and every new row is above the old max(rowid)
+    min_rowid = None
+    if n_triggers == len(WRANGLED_TRIGGERS) and len(stored_dict) == len(TABLE_NAMES) \
+            and all(stored[2] == 0 for stored in stored_dict.values()) \
+            and all(stored_dict[table][:2] == live_dict[table] for table in ['bikes', 'bikeshops']):
+        stored_count, stored_max_rowid = stored_dict['orderlines'][:2]
+        n_new = conn.execute(
+            sql.text("SELECT count(*) FROM orderlines WHERE rowid > :min_rowid"),
+            {"min_rowid": stored_max_rowid or 0}
+        ).scalar()
+        if live_dict['orderlines'][0] == stored_count + n_new:
+            min_rowid = stored_max_rowid or 0
+
+    # 2.0 Insert the new rows, or rebuild
+
+    if min_rowid is None:
+        conn.execute(sql.text(f"DELETE FROM {WRANGLED_TABLE}"))
+
+    query, params = _build_collect_data_query(min_rowid = min_rowid)
+
+    result = conn.execute(
+        sql.text(
+            f"INSERT INTO {WRANGLED_TABLE} ({', '.join(OUTPUT_COLUMNS)}, row_order) " + query
+        ),
+        params
+    )
+
+    # 3.0 New watermark
+
+    for table, (row_count, max_rowid) in live_dict.items():
+        conn.execute(
+            sql.text(
+                f"INSERT OR REPLACE INTO {WRANGLED_SOURCE_TABLE} (table_name, row_count, max_rowid, changes) "
+                "VALUES (:table_name, :row_count, :max_rowid, 0)"
+            ),
+            {"table_name": table, "row_count": row_count, "max_rowid": max_rowid}
+        )
+
+    return result.rowcount
+
+
+def _source_watermark_query():
+    """count(*) and max(rowid) of each source table, one row per table."""
+
+    return " UNION ALL ".join(
+        f"SELECT '{table}' AS table_name, count(*) AS row_count, max(rowid) AS max_rowid FROM {table}"
+        for table in TABLE_NAMES
+    )
+
+
+def _wrangled_is_current(fetchall):
+    """
+    True if WRANGLED_TABLE exists and matches its source tables.
+
+    `fetchall` runs a query and returns its rows, so the same check works on
+    SQLAlchemy and ADBC connections.
+    """
+
+    object_list = [(WRANGLED_TABLE, "table"), (WRANGLED_SOURCE_TABLE, "table")] + \
+        [(name, "trigger") for name in WRANGLED_TRIGGERS]
+
+    n_objects = fetchall(
+        "SELECT count(*) FROM sqlite_master WHERE " + " OR ".join(
+            f"(type = '{object_type}' AND name = '{name}')" for name, object_type in object_list
+        )
+    )[0][0]
+
+    if n_objects < len(object_list):
+        return False
+
+    n_current = fetchall(f"""
+        SELECT count(*)
+        FROM ({_source_watermark_query()}) AS live
+        JOIN {WRANGLED_SOURCE_TABLE} AS s ON s.table_name = live.table_name
+        WHERE s.changes = 0 AND s.row_count = live.row_count AND s.max_rowid IS live.max_rowid
+    """)[0][0]
+
+    if n_current < len(TABLE_NAMES):
+        logger.warning(
+            "%s is out of date with its source tables; reading the live join instead. "
+            "Run refresh_wrangled_table() to bring it up to date.", WRANGLED_TABLE
+        )
+        return False
+
+    return True
+
+
+def setup_wal(conn_string = "sqlite:///00_database/bike_orders_database.sqlite"):
+    """
+    Switches a SQLite database to write-ahead logging (WAL).
+
+    In WAL mode readers see a consistent snapshot while one writer appends,
+    so collect_data() no longer waits on (or fails with "database is
+    locked" because of) the ingestion job. The journal mode is stored in the
+    database file, so this only needs to run once. Afterwards, open readers
+    with profile = "wal_reader" and the writer with profile = "wal_writer".
+    The checkpoint settings (wal_autocheckpoint, journal_size_limit) only
+    last for the connection that sets them, so the "wal_writer" profile sets
+    them on every new connection. All processes must be on the same machine
+    (WAL uses shared memory).
+
+    Args:
+        conn_string (str, optional): A SQLAlchemy connection string for a SQLite database. Defaults to "sqlite:///00_database/bike_orders_database.sqlite".
+
+    Returns:
+        str: The journal mode reported by SQLite ("wal").
+    """
+
+    # Checks
+
+    if sql.engine.make_url(conn_string).get_backend_name() != "sqlite":
+        raise ValueError("`setup_wal()` only supports SQLite databases.")
+
+    # Body
+
+    engine = get_engine(conn_string)
+
+    # journal_mode cannot change inside a transaction
+    with engine.connect().execution_options(isolation_level = "AUTOCOMMIT") as conn:
+        journal_mode = conn.execute(sql.text("PRAGMA journal_mode = WAL")).scalar()
+
+    return journal_mode
+
+
+def checkpoint_wal(
+    conn_string = "sqlite:///00_database/bike_orders_database.sqlite",
+    mode        = "PASSIVE"
+):
+    """
+    Copies committed WAL pages back into the SQLite database file.
+
+    Args:
+        conn_string (str, optional): A SQLAlchemy connection string for a SQLite database. Defaults to "sqlite:///00_database/bike_orders_database.sqlite".
+        mode (str, optional): One of "PASSIVE" (never waits on readers), "FULL", "RESTART" or "TRUNCATE" (also empties the WAL file). Defaults to "PASSIVE".
+
+    Returns:
+        dict: "busy" (1 if the checkpoint could not finish), "log_pages" and "checkpointed_pages".
+    """
+
+    if mode not in ["PASSIVE", "FULL", "RESTART", "TRUNCATE"]:
+        raise ValueError("`mode` must be one of 'PASSIVE', 'FULL', 'RESTART' or 'TRUNCATE'.")
+
+    engine = get_engine(conn_string, profile = "wal_writer")
+
+    with engine.connect().execution_options(isolation_level = "AUTOCOMMIT") as conn:
+        busy, log_pages, checkpointed_pages = conn.execute(
+            sql.text(f"PRAGMA wal_checkpoint({mode})")
+        ).fetchone()
+
+    return {"busy": busy, "log_pages": log_pages, "checkpointed_pages": checkpointed_pages}
+
+
+def explain_collect_data(conn_string = "sqlite:///00_database/bike_orders_database.sqlite"):
+    """
+    Returns the SQLite query plans of the standard collect_data() queries.
+
+    Args:
+        conn_string (str, optional): A SQLAlchemy connection string for a SQLite database. Defaults to "sqlite:///00_database/bike_orders_database.sqlite".
+
+    Returns:
+        dict: Maps a query label to its EXPLAIN QUERY PLAN details joined by newlines.
+    """
+
+    query_dict = {
+        "sql: full"       : _build_collect_data_query(),
+        "sql: date range" : _build_collect_data_query(start_date = "2015-01-01", end_date = "2015-01-31"),
+        "pandas: orderlines date range" : _orderlines_query(start_date = "2015-01-01", end_date = "2015-01-31"),
+        "incremental: orderlines after watermark" : _orderlines_query(min_order_id = 1),
+    }
+
+    plan_dict = {}
+    with get_engine(conn_string).connect() as conn:
+        for label, (query, params) in query_dict.items():
+            rows = conn.execute(sql.text("EXPLAIN QUERY PLAN " + query), params or {}).fetchall()
+            plan_dict[label] = "\n".join(row[-1] for row in rows)
+
+    return plan_dict
+
+
+def _check_pushdown_args(columns, filters):
+    """Validates `columns` and `filters` against the output columns."""
+
+    if columns is None:
+        columns = list(OUTPUT_COLUMNS)
+    elif type(columns) is not list:
+        columns = [columns]
+
+    if filters is None:
+        filters = {}
+    elif type(filters) is not dict:
+        raise TypeError("`filters` must be a dict of column -> value(s).")
+
+    unknown = [col for col in [*columns, *filters] if col not in OUTPUT_COLUMNS]
+    if len(unknown) > 0:
+        raise ValueError(f"Unknown column(s): {unknown}. Must be in {OUTPUT_COLUMNS}.")
+
+    # Dates are stored as text in SQLite, so an order_date filter would not
+    # compare the same way on every backend
+    if 'order_date' in filters:
+        raise ValueError("Use `start_date` and `end_date` to filter on `order_date`, not `filters`.")
+
+    filters = {
+        col: [
+            _filter_value(col, value)
+            for value in (values if type(values) in [list, tuple, set] else [values])
+        ]
+        for col, values in filters.items()
+    }
+
+    return columns, filters
+
+
+def _filter_value(col, value):
+    """
+    Converts one `filters` value to the Python type of its output column.
+
+    Every backend then compares it the same way: e.g. 3500.0 matches an
+    integer price in pandas and SQLite alike, and numpy scalars bind as
+    plain numbers.
+    """
+
+    if isinstance(value, np.generic):
+        value = value.item()
+
+    if OUTPUT_DTYPES[col] == 'int64':
+        if type(value) is float and value.is_integer():
+            return int(value)
+        if type(value) is not int:
+            raise ValueError(f"`filters` values for `{col}` must be whole numbers, got {value!r}.")
+    elif type(value) is not str:
+        raise ValueError(f"`filters` values for `{col}` must be strings, got {value!r}.")
+
+    return value
+
+
+def _orderlines_where(
+    alias = "", start_date = None, end_date = None, min_order_id = None,
+    date_column = '"order.date"', id_column = '"order.id"'
+):
+    """
+    Builds the SQL predicates on the orderlines table and their bind parameters.
+
+    `alias` is the table prefix used in the query, e.g. "o.". `date_column`
+    and `id_column` name the order date and id columns (the raw orderlines
+    names by default).
+
+    Dates are bound as "YYYY-MM-DD HH:MM:SS" strings, which compare correctly
+    against the text timestamps pandas writes to SQLite. The upper bound is
+    exclusive at the start of the day after `end_date`.
+    """
+
+    column  = f'{alias}{date_column}'
+    clauses = []
+    params  = {}
+
+    if min_order_id is not None:
+        clauses.append(f'{alias}{id_column} > :min_order_id')
+        params["min_order_id"] = int(min_order_id)
+
+    if start_date is not None:
+        clauses.append(f"{column} >= :start_date")
+        params["start_date"] = pd.Timestamp(start_date) \
+            .strftime("%Y-%m-%d %H:%M:%S")
+
+    if end_date is not None:
+        clauses.append(f"{column} < :end_date")
+        params["end_date"] = (pd.Timestamp(end_date).normalize() + pd.Timedelta(days = 1)) \
+            .strftime("%Y-%m-%d %H:%M:%S")
+
+    return clauses, params
+
+
+def _filters_where(filters):
+    """Builds "column IN (...)" predicates on output columns and their bind parameters."""
+
+    clauses = []
+    params  = {}
+
+    for i, (col, values) in enumerate(filters.items()):
+        # An empty list matches nothing ("IN ()" is not valid everywhere)
+        if len(values) == 0:
+            clauses.append("1 = 0")
+            continue
+
+        names = [f"filter_{i}_{j}" for j in range(len(values))]
+        params.update(dict(zip(names, values)))
+        placeholders = ", ".join(f":{name}" for name in names)
+        clauses.append(f"{col} IN ({placeholders})")
+
+    return clauses, params
+
+
+def _build_collect_data_query(start_date = None, end_date = None, columns = None, filters = None, min_order_id = None, min_rowid = None):
+    """
+    Fills in COLLECT_DATA_SQL and returns the query text and its bind parameters.
+
+    `min_rowid` keeps only orderlines above that rowid (the rows appended
+    since a refresh_wrangled_table() watermark).
+    """
+
+    columns, filters = _check_pushdown_args(columns, filters)
+
+    params = {"desc_sep": " - ", "loc_sep": ", "}
+
+    # Date range on the base table so SQLite can range-scan orderlines
+    date_clauses, date_params = _orderlines_where("o.", start_date, end_date, min_order_id)
+    params.update(date_params)
+
+    if min_rowid is not None:
+        date_clauses.append("o.rowid > :min_rowid")
+        params["min_rowid"] = int(min_rowid)
+
+    orderlines_where = ""
+    if len(date_clauses) > 0:
+        orderlines_where = "WHERE " + " AND ".join(date_clauses)
+
+    # Value filters on the cleaned output columns
+    output_clauses, filter_params = _filters_where(filters)
+    params.update(filter_params)
+
+    output_where = ""
+    if len(output_clauses) > 0:
+        output_where = "WHERE " + " AND ".join(output_clauses)
+
+    query = COLLECT_DATA_SQL.format(
+        orderlines_where = orderlines_where,
+        columns          = ", ".join(columns),
+        output_where     = output_where
+    )
+
+    return query, params
+
+
+def _build_wrangled_query(start_date = None, end_date = None, columns = None, filters = None):
+    """Builds the SELECT on the materialized WRANGLED_TABLE and its bind parameters."""
+
+    columns, filters = _check_pushdown_args(columns, filters)
+
+    clauses, params = _orderlines_where(
+        "", start_date, end_date,
+        date_column = "order_date", id_column = "order_id"
+    )
+
+    filter_clauses, filter_params = _filters_where(filters)
+    clauses = clauses + filter_clauses
+    params.update(filter_params)
+
+    query = f"SELECT {', '.join(columns)}, row_order FROM {WRANGLED_TABLE}"
+    if len(clauses) > 0:
+        query = query + " WHERE " + " AND ".join(clauses)
+
+    return query, params
+
+
+def _collect_data_sql(conn, start_date = None, end_date = None, columns = None, filters = None, min_order_id = None):
+    """Runs the join and cleaning as one parameterized SQL query."""
+
+    query, params = _build_collect_data_query(
+        start_date   = start_date,
+        end_date     = end_date,
+        columns      = columns,
+        filters      = filters,
+        min_order_id = min_order_id
+    )
+
+    return _read_ordered(conn, query, params, columns, filters)
+
+
+def _collect_data_wrangled(conn, start_date = None, end_date = None, columns = None, filters = None):
+    """Reads the materialized WRANGLED_TABLE (see refresh_wrangled_table())."""
+
+    query, params = _build_wrangled_query(
+        start_date = start_date,
+        end_date   = end_date,
+        columns    = columns,
+        filters    = filters
+    )
+
+    return _read_ordered(conn, query, params, columns, filters)
+
+
+def _read_ordered(conn, query, params, columns, filters):
+    """Runs a query that returns the output columns plus row_order, and restores orderlines table order."""
+
+    columns, _ = _check_pushdown_args(columns, filters)
+
+    with _phase("query") as phase:
+        df = pd.read_sql(
+            sql.text(query),
+            con         = conn,
+            params      = params,
+            parse_dates = ['order_date'] if 'order_date' in columns else None
+        )
+        phase["rows_out"] = len(df)
+
+    # Back to orderlines table order, as in the pandas backend
+    with _phase("restore_order", rows_in = len(df)) as phase:
+        df = df \
+            .sort_values('row_order', kind = 'mergesort') \
+            .drop('row_order', axis = 1) \
+            .reset_index(drop = True)
+        phase["rows_out"] = len(df)
+
+    return _cast_empty(df)
+
+
+def _collect_data_arrow(
+    conn_string, profile = "default", start_date = None, end_date = None, columns = None,
+    filters = None, use_wrangled = True, dtype_backend = "numpy"
+):
+    """
+    Runs the SQL backend (or WRANGLED_TABLE) query through the ADBC SQLite driver.
+
+    Results arrive as an Arrow table, are put back in orderlines table order
+    and have "order_date" parsed with Arrow compute kernels, so no per-row
+    Python objects are created. With dtype_backend = "pyarrow" the pandas
+    columns wrap the Arrow buffers (pd.ArrowDtype, pandas >= 1.5).
+    """
+
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        raise ImportError("backend = 'arrow' requires the adbc-driver-sqlite and pyarrow packages.")
+
+    columns, filters = _check_pushdown_args(columns, filters)
+
+    # 1.0 Query
+
+    with _phase("connect"):
+        conn = _adbc_connect(conn_string, profile, backend = "arrow")
+
+    try:
+        cursor = conn.cursor()
+
+        if use_wrangled and _wrangled_is_current(lambda query: _adbc_fetchall(cursor, query)):
+            query, params = _build_wrangled_query(start_date, end_date, columns, filters)
+        else:
+            query, params = _build_collect_data_query(start_date, end_date, columns, filters)
+
+        with _phase("query") as phase:
+            table = _fetch_arrow(cursor, query, params, types = _arrow_output_types())
+            phase["rows_out"] = table.num_rows
+        cursor.close()
+    finally:
+        conn.close()
+
+    # 2.0 Table order & dates (Arrow compute)
+
+    with _phase("restore_order_and_dates", rows_in = table.num_rows):
+        table = table \
+            .take(pc.sort_indices(table["row_order"])) \
+            .drop(["row_order"])
+
+        if "order_date" in columns:
+            date_index = table.schema.get_field_index("order_date")
+            table = table.set_column(
+                date_index, "order_date",
+                pc.cast(table["order_date"], pa.timestamp("ns"))
+            )
+
+    # 3.0 Hand over to pandas
+
+    with _phase("to_pandas", rows_in = table.num_rows):
+        if dtype_backend == "pyarrow":
+            return table.to_pandas(types_mapper = pd.ArrowDtype)
+
+        return table.to_pandas()
+
+
+def _collect_data_duckdb(
+    conn_string, profile = "default", start_date = None, end_date = None, columns = None,
+    filters = None, use_wrangled = True, lazy = False
+):
+    """
+    Joins and cleans the tables in an embedded DuckDB (DUCKDB_COLLECT_DATA_SQL).
+
+    SQLite only filters orderlines to the date range; the three tables are
+    fetched as Arrow tables over ADBC and registered with an in-memory DuckDB
+    connection, which scans them without a copy. The join, string splits,
+    value filters and projection then run as one vectorized, multi-threaded
+    DuckDB query. If the database has WRANGLED_TABLE (and `use_wrangled`),
+    the pushdown query on it is fetched instead and DuckDB only parses the
+    dates.
+
+    Returns a pandas data frame in orderlines table order, or with lazy = True
+    the un-executed DuckDB relation (without table order).
+    """
+
+    try:
+        import duckdb
+    except ImportError:
+        raise ImportError("backend = 'duckdb' requires the duckdb, adbc-driver-sqlite and pyarrow packages.")
+
+    columns, filters = _check_pushdown_args(columns, filters)
+
+    # 1.0 Arrow tables from SQLite
+
+    table_dict = _fetch_source_tables(
+        conn_string, profile, start_date, end_date, columns, filters,
+        use_wrangled = use_wrangled,
+        backend      = "duckdb"
+    )
+
+    # 2.0 Join & cleaning in DuckDB
+
+    duck = duckdb.connect()
+
+    for name, table in table_dict.items():
+        duck.register(name, table)
+
+    select_list = columns if lazy else [*columns, "row_order"]
+
+    if "cleaned" in table_dict:
+        # Filters were already applied by the WRANGLED_TABLE query
+        select_list = [
+            "CAST(order_date AS TIMESTAMP) AS order_date" if col == "order_date" else col
+            for col in select_list
+        ]
+        query  = f"SELECT {', '.join(select_list)} FROM cleaned"
+        params = {}
+    else:
+        output_clauses, params = _filters_where(filters)
+
+        query = DUCKDB_COLLECT_DATA_SQL.format(
+            columns      = ", ".join(select_list),
+            output_where = "WHERE " + " AND ".join(output_clauses) if len(output_clauses) > 0 else ""
+        )
+
+    query, param_values = _to_numbered_params(query, params, prefix = "$")
+
+    if lazy:
+        return duck.sql(query, params = list(param_values))
+
+    # 3.0 Table order, then hand over to pandas
+
+    with _phase("join_and_clean") as phase:
+        df = duck.execute(f"SELECT * EXCLUDE (row_order) FROM ({query}) ORDER BY row_order", list(param_values)).df()
+        phase["rows_out"] = len(df)
+
+    duck.close()
+
+    # Integer columns with NULLs (price, total_price of order lines with no
+    # matching bike) arrive as nullable Int64; pandas gives float64
+    for col in df.columns:
+        if pd.api.types.is_extension_array_dtype(df[col]) and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = df[col].to_numpy(
+                dtype    = "float64" if df[col].isna().any() else "int64",
+                na_value = np.nan
+            )
+
+    return df
+
+
+def _fetch_source_tables(
+    conn_string, profile = "default", start_date = None, end_date = None, columns = None,
+    filters = None, use_wrangled = True, backend = "duckdb"
+):
+    """
+    Fetches the inputs of an in-process backend as Arrow tables over ADBC.
+
+    Returns {"cleaned": ...} with the WRANGLED_TABLE pushdown query result
+    (dates, `columns` and `filters` applied in SQLite) if the database has
+    that table and `use_wrangled`. Otherwise returns "bikes", "bikeshops"
+    and "orderlines", with orderlines cut to the date range and carrying its
+    rowid as row_order.
+    """
+
+    with _phase("connect"):
+        conn = _adbc_connect(conn_string, profile, backend = backend)
+
+    try:
+        cursor = conn.cursor()
+
+        if use_wrangled and _wrangled_is_current(lambda query: _adbc_fetchall(cursor, query)):
+            query, params = _build_wrangled_query(start_date, end_date, columns, filters)
+            with _phase("read_wrangled") as phase:
+                table_dict = {"cleaned": _fetch_arrow(cursor, query, params, types = _arrow_output_types())}
+                phase["rows_out"] = table_dict["cleaned"].num_rows
+        else:
+            date_clauses, date_params = _orderlines_where("", start_date, end_date)
+
+            orderlines_query = 'SELECT rowid AS row_order, "order.id", "order.line", "order.date", ' \
+                '"customer.id", "product.id", quantity FROM orderlines'
+            if len(date_clauses) > 0:
+                orderlines_query = orderlines_query + " WHERE " + " AND ".join(date_clauses)
+
+            with _phase("read_tables") as phase:
+                table_dict = {
+                    "bikes"      : _fetch_arrow(cursor, 'SELECT "bike.id", model, description, price FROM bikes'),
+                    "bikeshops"  : _fetch_arrow(cursor, 'SELECT "bikeshop.id", "bikeshop.name", location FROM bikeshops'),
+                    "orderlines" : _fetch_arrow(cursor, orderlines_query, date_params)
+                }
+                phase["rows_out"] = table_dict["orderlines"].num_rows
+        cursor.close()
+    finally:
+        conn.close()
+
+    return table_dict
+
+
+def _collect_data_polars(
+    conn_string, profile = "default", start_date = None, end_date = None, columns = None,
+    filters = None, use_wrangled = True, lazy = False
+):
+    """
+    Joins and cleans the tables as a Polars lazy query.
+
+    The tables are fetched as for backend = "duckdb" and wrapped as Polars
+    frames without a copy. The string splits (on the dimension tables), the
+    joins, date parsing, value filters and projection form one LazyFrame
+    that the Polars optimizer runs multi-threaded.
+
+    Returns a pandas data frame in orderlines table order, or with lazy = True
+    the LazyFrame (without table order).
+    """
+
+    try:
+        import polars as pl
+    except ImportError:
+        raise ImportError("backend = 'polars' requires the polars, adbc-driver-sqlite and pyarrow packages.")
+
+    columns, filters = _check_pushdown_args(columns, filters)
+
+    # 1.0 Arrow tables from SQLite
+
+    table_dict = _fetch_source_tables(
+        conn_string, profile, start_date, end_date, columns, filters,
+        use_wrangled = use_wrangled,
+        backend      = "polars"
+    )
+
+    lf_dict = {name: pl.from_arrow(table).lazy() for name, table in table_dict.items()}
+
+    # 2.0 Lazy join & cleaning
+
+    if "cleaned" in lf_dict:
+        # Filters were already applied by the WRANGLED_TABLE query
+        cleaned_lf = lf_dict["cleaned"]
+    else:
+        bikes_lf = lf_dict["bikes"] \
+            .with_columns(
+                pl.col("description")
+                    .str.split_exact(" - ", 2)
+                    .struct.rename_fields(["category_1", "category_2", "frame_material"])
+            ) \
+            .unnest("description") \
+            .rename({"bike.id": "bike_id"})
+
+        bikeshops_lf = lf_dict["bikeshops"] \
+            .with_columns(
+                pl.col("location")
+                    .str.split_exact(", ", 1)
+                    .struct.rename_fields(["city", "state"])
+            ) \
+            .unnest("location") \
+            .rename({"bikeshop.id": "bikeshop_id", "bikeshop.name": "bikeshop_name"})
+
+        cleaned_lf = lf_dict["orderlines"] \
+            .join(bikes_lf, left_on = "product.id", right_on = "bike_id", how = "left") \
+            .join(bikeshops_lf, left_on = "customer.id", right_on = "bikeshop_id", how = "left") \
+            .rename({"order.id": "order_id", "order.line": "order_line", "order.date": "order_date"}) \
+            .with_columns((pl.col("quantity") * pl.col("price")).alias("total_price"))
+
+        for col, values in filters.items():
+            dtype = pl.Int64 if OUTPUT_DTYPES[col] == 'int64' else pl.Utf8
+            cleaned_lf = cleaned_lf.filter(pl.col(col).is_in(pl.Series(values, dtype = dtype)))
+
+    if "order_date" in columns:
+        cleaned_lf = cleaned_lf.with_columns(
+            pl.col("order_date").str.to_datetime(time_unit = "ns")
+        )
+
+    if lazy:
+        return cleaned_lf.select(columns)
+
+    # 3.0 Table order, then hand over to pandas
+
+    with _phase("join_and_clean") as phase:
+        df = cleaned_lf \
+            .sort("row_order") \
+            .select(columns) \
+            .collect() \
+            .to_pandas()
+        phase["rows_out"] = len(df)
+
+    return df
+
+
+def _adbc_connect(conn_string, profile = "default", backend = "arrow"):
+    """Opens an ADBC SQLite connection to a file database with the profile's URI parameters and pragmas."""
+
+    try:
+        import adbc_driver_sqlite.dbapi as adbc_sqlite
+    except ImportError:
+        raise ImportError(f"backend = '{backend}' requires the adbc-driver-sqlite and pyarrow packages.")
+
+    url = sql.engine.make_url(conn_string)
+
+    if url.get_backend_name() != "sqlite" or url.database in [None, "", ":memory:"]:
+        raise ValueError(f"backend = '{backend}' only supports file-based SQLite databases.")
+
+    profile_dict = _get_profile(profile)
+
+    uri = url.database
+    if len(profile_dict["uri_params"]) > 0:
+        uri = f"file:{url.database}?{urlencode(profile_dict['uri_params'])}"
+
+    conn = adbc_sqlite.connect(uri)
+
+    cursor = conn.cursor()
+    for pragma, value in profile_dict["pragmas"].items():
+        cursor.execute(f"PRAGMA {pragma} = {value}")
+        cursor.fetchall()
+    cursor.close()
+
+    return conn
+
+
+def _adbc_fetchall(cursor, query):
+    cursor.execute(query)
+    return cursor.fetchall()
+
+
+def _fetch_arrow(cursor, query, params = None, types = None):
+    """
+    Runs a ":name"-parameterized query on an ADBC cursor and returns an Arrow table.
+
+    The driver takes each column's type from the first batch of rows, up to
+    ADBC_BATCH_ROWS. If a column is NULL throughout that batch and a later
+    batch fails to read, the query is re-run with the whole result in a
+    single batch. `types` ({column: Arrow type}) casts the columns it
+    names, which also types columns that are all NULL or come from a
+    zero-row result.
+    """
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    query, param_values = _to_numbered_params(query, params or {})
+
+    _set_batch_rows(cursor, ADBC_BATCH_ROWS)
+
+    try:
+        cursor.execute(query, parameters = param_values)
+        table = cursor.fetch_arrow_table()
+    except OSError:
+        # Type mismatch in a later batch: one batch holding the whole result
+        cursor.execute(f"SELECT count(*) FROM ({query})", parameters = param_values)
+        _set_batch_rows(cursor, max(cursor.fetchone()[0], 1))
+
+        cursor.execute(query, parameters = param_values)
+        table = cursor.fetch_arrow_table()
+
+    if types is not None:
+        table = pa.table({
+            name: pc.cast(column, types[name]) if name in types else column
+            for name, column in zip(table.column_names, table.columns)
+        })
+
+    return table
+
+
+def _set_batch_rows(cursor, batch_rows):
+    cursor.adbc_statement.set_options(**{"adbc.sqlite.query.batch_rows": str(batch_rows)})
+
+
+def _arrow_output_types():
+    """Arrow types of the output columns (and row_order) as read from SQLite, from OUTPUT_DTYPES."""
+
+    import pyarrow as pa
+
+    # order_date is stored as text and parsed after the read
+    arrow_types = {'int64': pa.int64(), 'datetime64[ns]': pa.string(), 'object': pa.string()}
+
+    types_dict = {col: arrow_types[dtype] for col, dtype in OUTPUT_DTYPES.items()}
+    types_dict['row_order'] = pa.int64()
+
+    return types_dict
+
+
+def _to_numbered_params(query, params, prefix = "?"):
+    """
+    Rewrites ":name" bind parameters as numbered "?N" parameters ("$N" with prefix = "$", for DuckDB).
+
+    The ADBC driver binds parameters by position; "?N" lets one value be
+    referenced several times (e.g. the split separators).
+    """
+
+    names = list(params)
+
+    def replace(match):
+        return f"{prefix}{names.index(match.group(1)) + 1}"
+
+    query = re.sub(
+        r":(" + "|".join(sorted(map(re.escape, names), key = len, reverse = True)) + r")\b",
+        replace,
+        query
+    ) if len(names) > 0 else query
+
+    return query, tuple(params[name] for name in names)
+
+
+def _collect_data_pandas(
+    conn, start_date = None, end_date = None, columns = None, filters = None,
+    min_order_id = None, concurrent = False, verbose = False
+):
+    """Reads the three tables and joins and cleans them in pandas."""
+
+    columns, filters = _check_pushdown_args(columns, filters)
+
+    query_dict = {
+        'bikes'      : ("SELECT * FROM bikes", None),
+        'bikeshops'  : ("SELECT * FROM bikeshops", None),
+        'orderlines' : _orderlines_query(
+            start_date, end_date, min_order_id,
+            row_order = conn.dialect.name == "sqlite"
+        )
+    }
+
+    data_dict = _read_tables(conn, query_dict, concurrent = concurrent, verbose = verbose)
+
+    with _phase("split_dimensions", rows_in = len(data_dict['bikes']) + len(data_dict['bikeshops'])):
+        data_dict.update(_split_dimension_tables(data_dict['bikes'], data_dict['bikeshops']))
+
+    df = _join_and_clean(
+        orderlines_df = data_dict['orderlines'],
+        bikes_df      = data_dict['bikes'],
+        bikeshops_df  = data_dict['bikeshops'],
+        columns       = columns,
+        filters       = filters
+    )
+
+    return df
+
+
+def _orderlines_query(start_date = None, end_date = None, min_order_id = None, row_order = False, order_by_rowid = False):
+    """
+    Returns the orderlines SELECT (with the optional predicates) and its bind parameters.
+
+    With predicates SQLite may answer from an index (e.g. the date or the
+    order key), which returns rows in index order. With `row_order` (SQLite
+    only) the rowid is selected as row_order so the caller can put them back
+    in table order, see _join_and_clean(). With `order_by_rowid` (SQLite
+    only) SQLite returns them in table order itself, for readers that cannot
+    sort the whole result (collect_data_chunked()).
+    """
+
+    date_clauses, date_params = _orderlines_where("", start_date, end_date, min_order_id)
+
+    query = "SELECT * FROM orderlines"
+    if len(date_clauses) > 0:
+        if row_order:
+            query = "SELECT rowid AS row_order, * FROM orderlines"
+        query = query + " WHERE " + " AND ".join(date_clauses)
+        if order_by_rowid:
+            query = query + " ORDER BY rowid"
+
+    return query, date_params
+
+
+def _read_table(conn, query, params = None):
+    """Reads one table and returns it with the seconds the read took."""
+
+    start = time.perf_counter()
+
+    # Tables written with DataFrame.to_sql() defaults carry a pandas "index" column
+    df = pd.read_sql(sql.text(query), con=conn, params=params) \
+        .drop("index", axis=1, errors="ignore")
+
+    return df, time.perf_counter() - start
+
+
+def _read_table_new_connection(engine, query, params = None):
+    """Thread-pool worker: reads one table on its own pooled connection."""
+
+    with engine.connect() as conn:
+        return _read_table(conn, query, params)
+
+
+def _read_tables(conn, query_dict, concurrent = False, verbose = False):
+    """
+    Reads several tables, one after another or concurrently.
+
+    Args:
+        conn (Connection): An open connection. Concurrent reads borrow one
+            extra connection per table from the same engine.
+        query_dict (dict): Maps table names to (query, params) tuples.
+        concurrent (bool, optional): Overlap the reads on a thread pool. Defaults to False.
+        verbose (bool, optional): Print per-table and total read times. Defaults to False.
+
+    Returns:
+        dict: Maps table names to data frames.
+    """
+
+    start = time.perf_counter()
+
+    if concurrent:
+        with _phase("read_tables") as phase:
+            with ThreadPoolExecutor(max_workers = len(query_dict)) as executor:
+                future_dict = {
+                    table: executor.submit(_read_table_new_connection, conn.engine, query, params)
+                    for table, (query, params) in query_dict.items()
+                }
+                result_dict = {table: future.result() for table, future in future_dict.items()}
+            phase["rows_out"] = sum(len(df) for df, _ in result_dict.values())
+    else:
+        result_dict = {}
+        for table, (query, params) in query_dict.items():
+            with _phase(f"read_{table}") as phase:
+                result_dict[table] = _read_table(conn, query, params)
+                phase["rows_out"] = len(result_dict[table][0])
+
+    wall_seconds = time.perf_counter() - start
+
+    if verbose:
+        read_seconds = sum(seconds for _, seconds in result_dict.values())
+        for table, (df, seconds) in result_dict.items():
+            print(f"read {table}: {len(df)} rows in {seconds:.3f}s")
+        if concurrent:
+            print(
+                f"read {len(result_dict)} tables concurrently: {wall_seconds:.3f}s wall, "
+                f"{read_seconds:.3f}s summed, {read_seconds - wall_seconds:.3f}s saved by overlap"
+            )
+        else:
+            print(f"read {len(result_dict)} tables sequentially: {wall_seconds:.3f}s wall")
+
+    return {table: df for table, (df, _) in result_dict.items()}
+
+
+def _read_dimension_tables(conn):
+    """Reads the small products (bikes) and customers (bikeshops) tables and derives their attributes."""
+
+    data_dict = _read_tables(conn, {
+        'bikes'     : ("SELECT * FROM bikes", None),
+        'bikeshops' : ("SELECT * FROM bikeshops", None)
+    })
+
+    return _split_dimension_tables(data_dict['bikes'], data_dict['bikeshops'])
+
+
+def _split_dimension_tables(bikes_df, bikeshops_df):
+    """
+    Splits the bike description and the shop location into their parts.
+
+    Runs on the dimension tables before the join, so the string work scales
+    with the number of products and customers instead of order lines.
+    """
+
+    # reindex() keeps the split columns when a table is empty
+    bikes_df = bikes_df.copy()
+
+    temp_df = bikes_df['description'].str.split(" - ", expand = True) \
+        .reindex(columns = range(3))
+    bikes_df['category.1'] = temp_df[0]
+    bikes_df['category.2'] = temp_df[1]
+    bikes_df['frame.material'] = temp_df[2]
+
+    bikeshops_df = bikeshops_df.copy()
+
+    temp_df = bikeshops_df['location'].str.split(", ", expand = True) \
+        .reindex(columns = range(2))
+    bikeshops_df['city'] = temp_df[0]
+    bikeshops_df['state'] = temp_df[1]
+
+    return {"bikes": bikes_df, "bikeshops": bikeshops_df}
+
+
+def _join_and_clean(orderlines_df, bikes_df, bikeshops_df, columns, filters):
+    """Joins orderlines to the split dimension tables (see _split_dimension_tables()) and applies the standard cleaning."""
+
+    # 1.0 Back to orderlines table order (see _orderlines_query())
+
+    if 'row_order' in orderlines_df.columns:
+        with _phase("restore_order", rows_in = len(orderlines_df)):
+            orderlines_df = orderlines_df \
+                .sort_values('row_order', kind = 'mergesort') \
+                .drop('row_order', axis = 1) \
+                .reset_index(drop = True)
+
+    # 2.0 Combining Data
+
+    with _phase("merge", rows_in = len(orderlines_df)) as phase:
+        joined_df = pd.DataFrame(orderlines_df) \
+            .merge(
+                right    = bikes_df,
+                how      = 'left',
+                left_on  = 'product.id',
+                right_on = 'bike.id'
+            ) \
+            .merge(
+                right    = bikeshops_df,
+                how      = "left",
+                left_on  = "customer.id",
+                right_on = 'bikeshop.id'
+            )
+        phase["rows_out"] = len(joined_df)
+
+    # 3.0 Cleaning Data
+
+    df = joined_df
+
+    with _phase("to_datetime", rows_in = len(df)):
+        df['order.date'] = pd.to_datetime(df['order.date'])
+
+    with _phase("clean", rows_in = len(df)) as phase:
+        df['total.price'] = df['quantity'] * df['price']
+
+        df = df[COLS_TO_KEEP_LIST]
+
+        df.columns = df.columns.str.replace(".", "_",regex=False)
+
+        # 4.0 Filters & Projection
+
+        df = _filter_frame(df, columns = columns, filters = filters)
+
+        phase["rows_out"] = len(df)
+
+    # df.info()
+
+    return df
+
+
+def _filter_frame(df, start_date = None, end_date = None, columns = None, filters = None):
+    """Applies the collect_data() date range, filters and projection to a cleaned frame in pandas."""
+
+    columns, filters = _check_pushdown_args(columns, filters)
+
+    mask = pd.Series(True, index = df.index)
+
+    if start_date is not None:
+        mask &= df['order_date'] >= pd.Timestamp(start_date)
+
+    if end_date is not None:
+        mask &= df['order_date'] < pd.Timestamp(end_date).normalize() + pd.Timedelta(days = 1)
+
+    for col, values in filters.items():
+        mask &= df[col].isin(values)
+
+    # Always a RangeIndex, also when no row (or every row) is left
+    df = df[mask].reset_index(drop = True)
+
+    return _cast_empty(df[columns])
+
+
+def _cast_empty(df):
+    """Gives a zero-row result the OUTPUT_DTYPES and RangeIndex of a non-empty one."""
+
+    if len(df) > 0:
+        return df
 
-    return df
\ No newline at end of file
+    return df \
+        .reset_index(drop = True) \
+        .astype({col: OUTPUT_DTYPES[col] for col in df.columns if col in OUTPUT_DTYPES})
@@ -0,0 +1,266 @@
+
+
+# IMPORTS ----
+
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from openpyxl import load_workbook
+
+
+# READ RAW DATA ----
+def read_raw(xlsx_path, columns = None, refresh = True):
+    """
+    Reads a raw Excel input, preferring its typed Parquet copy.
+
+    The first call converts the workbook with convert_excel(); later calls
+    read the Parquet file, which is much faster than parsing the xlsx again.
+    If the xlsx has changed since the copy was written, it is converted again.
+
+    Args:
+        xlsx_path (str): Path to the workbook, e.g. "00_data_raw/orderlines.xlsx".
+        columns (list, optional): Only read these columns. Defaults to None (all columns).
+        refresh (bool, optional): Re-convert when the xlsx has changed. If False, an existing Parquet copy is used as is. Defaults to True.
+
+    Returns:
+        DataFrame: The same data pd.read_excel(xlsx_path) returns.
+    """
+
+    parquet_path = _parquet_path(xlsx_path)
+
+    if not os.path.exists(parquet_path) or (refresh and not _is_current(xlsx_path, parquet_path)):
+        convert_excel(xlsx_path, parquet_path)
+
+    return pd.read_parquet(parquet_path, columns = columns)
+
+
+def convert_excel(xlsx_path, parquet_path = None, batch_size = 50000):
+    """
+    Streams the first sheet of a workbook into a typed Parquet file.
+
+    The workbook is opened in openpyxl's read-only mode and read
+    `batch_size` rows at a time, and each batch is appended to the Parquet
+    file, so memory use stays bounded whatever the sheet size. Column types
+    (e.g. int64, datetime64, string) come from the batches seen so far and
+    are widened when a later batch does not fit them, e.g. int64 to float64
+    when a blank cell or a fraction turns up. Like pd.read_excel(), the
+    first row holds the headers and empty headers become "Unnamed: <position>".
+
+    The size and modification time of the xlsx are stored next to the
+    Parquet file (as "<parquet_path>.json") so read_raw() can tell when
+    the copy is out of date.
+
+    Args:
+        xlsx_path (str): Path to the workbook.
+        parquet_path (str, optional): Output path. Defaults to the xlsx path with a ".parquet" extension.
+        batch_size (int, optional): Rows per batch. Defaults to 50000.
+
+    Returns:
+        str: The Parquet file path.
+    """
+
+    # Checks
+
+    if (type(batch_size) is not int) or (batch_size < 1):
+        raise ValueError("`batch_size` must be a positive integer.")
+
+    # Body
+
+    if parquet_path is None:
+        parquet_path = _parquet_path(xlsx_path)
+
+    tmp_path = parquet_path + ".tmp"
+
+    workbook = load_workbook(xlsx_path, read_only = True, data_only = True)
+
+    try:
+        worksheet = workbook.worksheets[0]
+
+        # Read-only mode trusts the sheet's stored dimensions, which some
+        # writers leave wrong (e.g. "A1"); reset them so every row is read
+        worksheet.reset_dimensions()
+
+        row_iter = worksheet.iter_rows(values_only = True)
+
+        header = next(row_iter, None)
+        if header is None:
+            raise ValueError(f"`{xlsx_path}` has no header row.")
+
+        columns = [
+            f"Unnamed: {i}" if name is None else str(name)
+            for i, name in enumerate(header)
+        ]
+
+        writer = None
+        batch  = []
+        n_rows = 0
+
+        for row in row_iter:
+            batch.append(row)
+            if len(batch) == batch_size:
+                writer = _write_batch(writer, batch, columns, tmp_path)
+                n_rows += len(batch)
+                batch = []
+
+        if len(batch) > 0 or writer is None:
+            writer = _write_batch(writer, batch, columns, tmp_path)
+            n_rows += len(batch)
+
+        # Columns blank in every row are float64, as pd.read_excel() reads them
+        if n_rows > 0 and any(pa.types.is_null(field.type) for field in writer.schema):
+            writer = _rewrite_with_schema(writer, tmp_path, pa.schema([
+                pa.field(field.name, pa.float64() if pa.types.is_null(field.type) else field.type)
+                for field in writer.schema
+            ]))
+
+        writer.close()
+
+    finally:
+        workbook.close()
+
+    os.replace(tmp_path, parquet_path)
+
+    with open(parquet_path + ".json", "w") as f:
+        json.dump(_source_fingerprint(xlsx_path), f)
+
+    return parquet_path
+
+
+def _write_batch(writer, batch, columns, path):
+    """
+    Appends one batch of rows, opening the writer on the first batch.
+
+    Column types come from the batches seen so far. When a batch does not
+    fit them (e.g. a whole-number column that later holds 5.5 or a blank
+    cell), the schema is widened, see _widen_type(), and the rows already
+    written are copied into a file with the wider schema.
+    """
+
+    batch_df = _infer_types(pd.DataFrame.from_records(batch, columns = columns))
+
+    table = pa.Table.from_pandas(batch_df, preserve_index = False)
+
+    # Columns blank in the whole batch have no type of their own yet
+    table = pa.table({
+        name: pa.nulls(len(column)) if len(column) > 0 and column.null_count == len(column) else column
+        for name, column in zip(table.column_names, table.columns)
+    })
+
+    if writer is None:
+        writer = pq.ParquetWriter(path, table.schema)
+    else:
+        schema = pa.schema([
+            pa.field(field.name, _widen_type(field.type, table.schema.field(field.name).type))
+            for field in writer.schema
+        ])
+        if not schema.equals(writer.schema):
+            writer = _rewrite_with_schema(writer, path, schema)
+        table = _cast_table(table, schema)
+
+    writer.write_table(table)
+
+    return writer
+
+
+def _cast_table(table, schema):
+    return pa.table({
+        field.name: table.column(field.name).cast(field.type)
+        for field in schema
+    }, schema = schema)
+
+
+def _widen_type(current_type, batch_type):
+    """
+    The narrowest type holding both: an all-blank (null) column fits any
+    type, integers and floats widen to float64 (as pd.read_excel() reads a
+    column with blanks or fractions) and anything else becomes string.
+    """
+
+    if current_type.equals(batch_type) or pa.types.is_null(batch_type):
+        return current_type
+
+    if pa.types.is_null(current_type):
+        return batch_type
+
+    is_number = lambda t: pa.types.is_integer(t) or pa.types.is_floating(t)
+
+    if is_number(current_type) and is_number(batch_type):
+        return pa.float64()
+
+    return pa.string()
+
+
+def _rewrite_with_schema(writer, path, schema):
+    """Closes `writer` and copies its file, row group by row group, into a new writer with `schema`."""
+
+    writer.close()
+
+    old_path = path + ".old"
+    os.replace(path, old_path)
+
+    new_writer = pq.ParquetWriter(path, schema)
+
+    with open(old_path, "rb") as f:
+        parquet_file = pq.ParquetFile(f)
+        for i in range(parquet_file.num_row_groups):
+            new_writer.write_table(_cast_table(parquet_file.read_row_group(i), schema))
+
+    os.remove(old_path)
+
+    return new_writer
+
+
+def _infer_types(data):
+    """
+    Applies the type inference pd.read_excel() does on raw cell values.
+
+    Text cells that all parse as numbers become numeric, and float columns
+    whose values are all whole numbers become int64 (Excel stores every
+    number as a float).
+    """
+
+    df = data.copy()
+
+    for col in df.columns:
+
+        if df[col].dtype == object:
+            try:
+                df[col] = pd.to_numeric(df[col])
+            except (ValueError, TypeError):
+                # Text mixed with numbers or dates: a Parquet column has one
+                # type, so keep all of it as text
+                is_text = df[col].map(lambda value: isinstance(value, str))
+                if is_text.any() and not is_text[df[col].notna()].all():
+                    df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+                continue
+
+        if pd.api.types.is_float_dtype(df[col]) and df[col].notna().all() \
+                and (df[col] % 1 == 0).all():
+            df[col] = df[col].astype("int64")
+
+    return df
+
+
+def _parquet_path(xlsx_path):
+    return os.path.splitext(xlsx_path)[0] + ".parquet"
+
+
+def _source_fingerprint(xlsx_path):
+    stat = os.stat(xlsx_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _is_current(xlsx_path, parquet_path):
+    """True if the Parquet copy was written from the xlsx as it is now."""
+
+    meta_path = parquet_path + ".json"
+
+    if not os.path.exists(meta_path):
+        return False
+
+    with open(meta_path) as f:
+        return json.load(f) == _source_fingerprint(xlsx_path)
@@ -7,7 +7,7 @@ import pandas_flavor as pf
 
 @pf.register_dataframe_method
 def summarize_by_time(
-    data, date_column, value_column, 
+    data, date_column, value_column = None, 
     groups = None, 
     rule   = "D",
     agg_func = np.sum, 
@@ -15,6 +15,7 @@ def summarize_by_time(
     wide_format = True, 
     fillna = 0,
     *args,
+    engine = "pandas",
     **kwargs 
 ):
     """
@@ -25,20 +26,38 @@ def summarize_by_time(
             A pandas data frame with a date column and value column. 
         date_column ([str]): 
             The name of a single date or datetime column to be aggregated by. Must be datetime64.
-        value_column ([str, list]): 
-            The names of one or more value columns to be aggregated by. 
+        value_column ([str, list, None]): 
+            The names of one or more value columns to be aggregated by. May be None 
+            when `agg_func` is a dict (its keys are the value columns). 
         groups ([str, list, None], optional): 
             One or more column names representing groups to aggregate by. Defaults to None.
         rule (str, optional): 
             A pandas frequency (offset) such as "D" for Daily or "MS" for Month Start. Defaults to "D".
-        agg_func ([function, list], optional): 
-            One or more aggregating functions such as np.sum. Defaults to np.sum.
+        agg_func ([function, list, dict], optional): 
+            One or more aggregating functions such as np.sum, applied to every value column. 
+            A dict maps each value column to its own function or list of functions, e.g. 
+            {"total_price": [np.sum, np.mean, "count"], "quantity": np.sum}; all of them 
+            are computed in a single grouped pass and the columns are 
+            (value column, function) pairs (then the groups, in wide format), as with a 
+            list of functions. Defaults to np.sum.
         kind (str, optional): 
             One of "timestamp" or "period". Defaults to "timestamp".
         wide_format (bool, optional): 
             Whether or not to return "wide" or "long" format. Defaults to True.
         fillna (int, optional): 
             Value to fill in missing data. Defaults to 0. If missing values are desired, use np.nan.
+        engine (str, optional): 
+            Where the group/resample aggregation runs. One of "pandas", "duckdb", "polars" or "numpy". 
+            "duckdb" runs it as one multi-threaded SQL query in an embedded DuckDB and 
+            "polars" as a multi-threaded Polars lazy query. Both support the rules 
+            D, W, M, MS, Q, QS, Y (A) and YS (AS) with sum, mean, count, min and max, 
+            and accept their own lazy data as `data` (a DuckDB relation or a Polars 
+            LazyFrame, e.g. from collect_data(backend = "duckdb", lazy = True)), so 
+            the full data never has to be loaded into pandas. Requires duckdb or 
+            polars. "numpy" (same rules and functions) factorizes the groups and 
+            aggregates with np.bincount/reduceat straight into the wide 
+            bins x groups matrix, which is much faster than pandas when there 
+            are thousands of groups. Keyword-only. Defaults to "pandas".
         *args, **kwargs: 
             Arguments passed to pd.DataFrame.agg()
 
@@ -48,40 +67,99 @@ def summarize_by_time(
 
     # CHECKS
 
-    if (type(data) is not pd.DataFrame):
+    if engine not in ["pandas", "duckdb", "polars", "numpy"]:
+        raise ValueError("`engine` must be one of 'pandas', 'duckdb', 'polars' or 'numpy'.")
+
+    if (type(data) is not pd.DataFrame) \
+            and not (engine == "duckdb" and _is_duckdb_relation(data)) \
+            and not (engine == "polars" and _is_polars_frame(data)):
         raise TypeError("`data` is not Pandas Data Frame.")
 
+    if type(agg_func) is dict:
+        if (value_column is not None) and (set(_group_list(value_column)) != set(agg_func)):
+            raise ValueError("`value_column` must match the keys of `agg_func` when `agg_func` is a dict.")
+
+        # One list of functions per value column, so every aggregate gets a
+        # (value column, function) column
+        value_column = list(agg_func)
+        agg_func     = {
+            col: func if type(func) is list else [func]
+            for col, func in agg_func.items()
+        }
+
+    if value_column is None:
+        raise ValueError("`value_column` is required unless `agg_func` is a dict.")
+
     if type(value_column) is not list:
         value_column = [value_column]
     
     # BODY 
 
-    # Handle date column
-    data = data.set_index(date_column)
+    if engine == "duckdb":
 
-    # Handle groupby
-    if groups is not None:
-        data = data.groupby(groups)
+        # Group, resample & aggregate in DuckDB
+        data = _summarize_by_time_duckdb(
+            data, date_column, value_column,
+            groups   = groups,
+            rule     = rule,
+            agg_func = agg_func,
+            kind     = kind
+        )
 
-    # Handle resample
-    data = data.resample(
-        rule = rule,
-        kind = kind
-    )
+    elif engine == "polars":
+
+        # Group, resample & aggregate in a Polars lazy query
+        data = _summarize_by_time_polars(
+            data, date_column, value_column,
+            groups   = groups,
+            rule     = rule,
+            agg_func = agg_func,
+            kind     = kind
+        )
+
+    elif engine == "numpy":
+
+        # Aggregate straight into a bins x groups matrix (already wide)
+        data = _summarize_by_time_numpy(
+            data, date_column, value_column,
+            groups      = groups,
+            rule        = rule,
+            agg_func    = agg_func,
+            kind        = kind,
+            wide_format = wide_format
+        )
 
-    # Handle aggregation
-    function_list = [agg_func] * len(value_column)
-    agg_dict      = dict(zip(value_column, function_list))
+    else:
 
-    data = data \
-        .agg(
-            func = agg_dict,
-            *args,
-            **kwargs 
+        # Handle date column
+        data = data.set_index(date_column)
+
+        # Handle groupby
+        if groups is not None:
+            data = data.groupby(groups)
+
+        # Handle resample
+        data = data.resample(
+            rule = rule,
+            kind = kind
         )
 
+        # Handle aggregation
+        if type(agg_func) is dict:
+            agg_dict = agg_func
+        else:
+            function_list = [agg_func] * len(value_column)
+            agg_dict      = dict(zip(value_column, function_list))
+
+        data = data \
+            .agg(
+                func = agg_dict,
+                *args,
+                **kwargs 
+            )
+
     # Handle Pivot Wider 
-    if wide_format:
+    if wide_format and engine != "numpy":
         if groups is not None:
             data = data.unstack(groups)
             if (kind == 'period'):
@@ -90,3 +168,577 @@ def summarize_by_time(
     data = data.fillna(value = fillna)
 
     return data
+
+
+
+# ENGINE HELPERS ----
+
+# Aggregating functions the "duckdb", "polars" and "numpy" engines can run, by the
+# name pandas gives them in the output columns
+AGG_FUNC_NAMES = {
+    np.sum  : "sum",
+    np.mean : "mean",
+    np.min  : "min",
+    np.max  : "max",
+    sum     : "sum",
+    min     : "min",
+    max     : "max"
+}
+
+
+def _group_list(groups):
+    if groups is None:
+        return []
+    return groups if type(groups) is list else [groups]
+
+
+def _agg_func_names(agg_func):
+    """The pandas output names of one or a list of aggregating functions, e.g. np.sum -> ["sum"]."""
+
+    func_list = agg_func if type(agg_func) is list else [agg_func]
+
+    name_list = []
+    for func in func_list:
+        name = func if type(func) is str else AGG_FUNC_NAMES.get(func)
+        if name not in ["sum", "mean", "count", "min", "max"]:
+            raise ValueError(f"`agg_func` {func!r} is not supported by this engine. Use sum, mean, count, min or max.")
+        name_list.append(name)
+
+    return name_list
+
+
+def _agg_pairs(value_column, agg_func):
+    """(value column, function name) of every aggregate, in output column order."""
+
+    if type(agg_func) is dict:
+        return [(col, name) for col, func in agg_func.items() for name in _agg_func_names(func)]
+
+    return [(col, name) for col in value_column for name in _agg_func_names(agg_func)]
+
+
+def _agg_columns(value_column, agg_func):
+    """The aggregate columns: the value columns, or (value column, function) pairs for a list or dict of functions."""
+
+    if type(agg_func) in [list, dict]:
+        return pd.MultiIndex.from_tuples(_agg_pairs(value_column, agg_func))
+
+    return pd.Index(value_column)
+
+
+def _rule_key(rule, rule_dict, engine):
+    """The pandas offset name of `rule` (e.g. "Y" -> "A-DEC"), checked against an engine's supported rules."""
+
+    freqstr = pd.tseries.frequencies.to_offset(rule).freqstr
+
+    if freqstr not in rule_dict:
+        raise ValueError(f"`rule` {rule!r} is not supported by engine = '{engine}'. Use one of D, W, M, MS, Q, QS, Y, YS.")
+
+    return freqstr
+
+
+def _resample_layout(df, date_column, value_column, group_list, agg_func, rule, kind):
+    """
+    Puts an engine's long result (group columns, bin label, one column per
+    value and function) into the layout groupby().resample().agg() returns.
+    """
+
+    # Integer aggregates may arrive as nullable Int64; pandas gives int64,
+    # or float64 when empty bins leave gaps
+    for col in df.columns[len(group_list) + 1:]:
+        if pd.api.types.is_extension_array_dtype(df[col]):
+            df[col] = df[col].to_numpy(
+                dtype    = "float64" if df[col].isna().any() else "int64",
+                na_value = np.nan
+            )
+
+    df[date_column] = df[date_column].astype("datetime64[ns]")
+
+    df = df \
+        .set_index([*group_list, date_column]) \
+        .sort_index()
+
+    df.columns = _agg_columns(value_column, agg_func)
+
+    if len(group_list) == 0:
+        df.index = pd.DatetimeIndex(df.index, freq = rule)
+        if kind == "period":
+            df.index = df.index.to_period()
+
+    return df
+
+
+# DUCKDB ENGINE ----
+
+# Bins for the rules the "duckdb" engine supports, keyed by the pandas
+# offset name (so "Y", "A" and "A-DEC" are the same rule). Each bin starts at
+# date_trunc(unit, date); consecutive bins are `step` apart and `label` turns
+# a bin start into the timestamp pandas labels the bin with (e.g. the last
+# day of the month for "M", the Sunday ending the week for "W").
+DUCKDB_RULES = {
+    "D"      : ("day",     "INTERVAL 1 DAY",   "{bin}"),
+    "W-SUN"  : ("week",    "INTERVAL 7 DAY",   "{bin} + INTERVAL 6 DAY"),
+    "M"      : ("month",   "INTERVAL 1 MONTH", "{bin} + INTERVAL 1 MONTH - INTERVAL 1 DAY"),
+    "MS"     : ("month",   "INTERVAL 1 MONTH", "{bin}"),
+    "Q-DEC"  : ("quarter", "INTERVAL 3 MONTH", "{bin} + INTERVAL 3 MONTH - INTERVAL 1 DAY"),
+    "QS-JAN" : ("quarter", "INTERVAL 3 MONTH", "{bin}"),
+    "A-DEC"  : ("year",    "INTERVAL 1 YEAR",  "{bin} + INTERVAL 1 YEAR - INTERVAL 1 DAY"),
+    "AS-JAN" : ("year",    "INTERVAL 1 YEAR",  "{bin}")
+}
+
+INTEGER_TYPES = ["TINYINT", "SMALLINT", "INTEGER", "BIGINT", "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT"]
+
+
+def _is_duckdb_relation(data):
+    return type(data).__name__ == "DuckDBPyRelation"
+
+
+def _summarize_by_time_duckdb(data, date_column, value_column, groups = None, rule = "D", agg_func = np.sum, kind = "timestamp"):
+    """
+    Runs the groupby/resample/agg step of summarize_by_time() in DuckDB.
+
+    Returns the same long-format frame as pandas'
+    groupby(groups).resample(rule).agg(): one row per group and bin from the
+    group's first to its last bin (empty bins sum/count to 0, other
+    functions give NaN), indexed by the groups and the bin label and sorted
+    by them. Only this summary is converted to pandas.
+    """
+
+    try:
+        import duckdb
+    except ImportError:
+        raise ImportError("engine = 'duckdb' requires the duckdb package.")
+
+    unit, step, label = DUCKDB_RULES[_rule_key(rule, DUCKDB_RULES, "duckdb")]
+
+    group_list = _group_list(groups)
+    pair_list  = _agg_pairs(value_column, agg_func)
+
+    # 1.0 Relation to query
+
+    if _is_duckdb_relation(data):
+        relation = data
+    else:
+        relation = duckdb.connect().from_df(data)
+
+    column_types = dict(zip(relation.columns, [str(t) for t in relation.types]))
+
+    def quote(name):
+        return '"' + name.replace('"', '""') + '"'
+
+    keys = [quote(col) for col in group_list]
+
+    # 2.0 Aggregates per group & bin, the bins between each group's first and
+    #     last bin (empty bins included) and the aggregates joined onto them
+
+    agg_list  = []
+    fill_list = []
+    for i, (col, name) in enumerate(pair_list):
+        alias = f"__value_{i}"
+        expr  = f"{name}({quote(col)})"
+        if name == "sum" and column_types[col] in INTEGER_TYPES:
+            expr = f"CAST({expr} AS BIGINT)"
+        agg_list.append(f"{expr} AS {alias}")
+        fill_list.append(
+            f"coalesce(a.{alias}, 0) AS {alias}" if name in ["sum", "count"] else f"a.{alias}"
+        )
+
+    not_null = " AND ".join(f"{col} IS NOT NULL" for col in [quote(date_column), *keys])
+
+    query = f"""
+    WITH binned AS (
+        SELECT {"".join(key + ", " for key in keys)}
+            CAST(date_trunc('{unit}', {quote(date_column)}) AS TIMESTAMP) AS __bin,
+            {", ".join(quote(col) for col in value_column)}
+        FROM data
+        WHERE {not_null}
+    ),
+    agg AS (
+        SELECT {"".join(key + ", " for key in keys)} __bin, {", ".join(agg_list)}
+        FROM binned
+        GROUP BY {"".join(key + ", " for key in keys)} __bin
+    ),
+    span AS (
+        SELECT {"".join(key + ", " for key in keys)} min(__bin) AS first_bin, max(__bin) AS last_bin
+        FROM agg
+        {"GROUP BY " + ", ".join(keys) if len(keys) > 0 else ""}
+    ),
+    grid AS (
+        SELECT {"".join(key + ", " for key in keys)} unnest(generate_series(first_bin, last_bin, {step})) AS __bin
+        FROM span
+        WHERE first_bin IS NOT NULL
+    )
+    SELECT {"".join(f"g.{key}, " for key in keys)}
+        {label.format(bin = "g.__bin")} AS {quote(date_column)},
+        {", ".join(fill_list)}
+    FROM grid AS g
+    LEFT JOIN agg AS a ON {" AND ".join(f"g.{key} = a.{key}" for key in [*keys, "__bin"])}
+    """
+
+    df = relation.query("data", query).df()
+
+    return _resample_layout(df, date_column, value_column, group_list, agg_func, rule, kind)
+
+
+# POLARS ENGINE ----
+
+# Bins for the rules the "polars" engine supports, keyed like DUCKDB_RULES.
+# Each bin starts at date.dt.truncate(every); with end_label the bin is
+# labelled with its last day (bin start + every - 1 day), as pandas does for
+# "W", "M", "Q" and "Y".
+POLARS_RULES = {
+    "D"      : ("1d",  False),
+    "W-SUN"  : ("1w",  True),
+    "M"      : ("1mo", True),
+    "MS"     : ("1mo", False),
+    "Q-DEC"  : ("3mo", True),
+    "QS-JAN" : ("3mo", False),
+    "A-DEC"  : ("1y",  True),
+    "AS-JAN" : ("1y",  False)
+}
+
+
+def _is_polars_frame(data):
+    return type(data).__module__.startswith("polars") and type(data).__name__ in ["DataFrame", "LazyFrame"]
+
+
+def _summarize_by_time_polars(data, date_column, value_column, groups = None, rule = "D", agg_func = np.sum, kind = "timestamp"):
+    """
+    Runs the groupby/resample/agg step of summarize_by_time() as a Polars lazy query.
+
+    Returns the same long-format frame as _summarize_by_time_duckdb(). The
+    query (truncate to bins, group_by, aggregate, fill in the empty bins) is
+    optimized and run multi-threaded by Polars; only the summary is
+    converted to pandas.
+    """
+
+    try:
+        import polars as pl
+    except ImportError:
+        raise ImportError("engine = 'polars' requires the polars package.")
+
+    every, end_label = POLARS_RULES[_rule_key(rule, POLARS_RULES, "polars")]
+
+    group_list = _group_list(groups)
+    pair_list  = _agg_pairs(value_column, agg_func)
+
+    # 1.0 Lazy frame to query
+
+    if type(data) is pd.DataFrame:
+        lf = pl.from_pandas(data[[*group_list, date_column, *value_column]]).lazy()
+    else:
+        lf = data.lazy()
+
+    # 2.0 Aggregates per group & bin
+
+    agg_list = []
+    for i, (col, name) in enumerate(pair_list):
+        expr = pl.col(col).count().cast(pl.Int64) if name == "count" else getattr(pl.col(col), name)()
+        agg_list.append(expr.alias(f"__value_{i}"))
+
+    agg_lf = lf \
+        .filter(pl.all_horizontal([pl.col(col).is_not_null() for col in [date_column, *group_list]])) \
+        .with_columns(pl.col(date_column).cast(pl.Datetime("ns")).dt.truncate(every).alias("__bin")) \
+        .group_by([*group_list, "__bin"]) \
+        .agg(agg_list)
+
+    # 3.0 Bins between each group's first and last bin, aggregates joined on
+
+    span_list = [pl.col("__bin").min().alias("first_bin"), pl.col("__bin").max().alias("last_bin")]
+
+    if len(group_list) > 0:
+        span_lf = agg_lf.group_by(group_list).agg(span_list)
+    else:
+        span_lf = agg_lf.select(span_list)
+
+    grid_lf = span_lf \
+        .filter(pl.col("first_bin").is_not_null()) \
+        .select([
+            *group_list,
+            pl.datetime_ranges("first_bin", "last_bin", interval = every, time_unit = "ns").alias("__bin")
+        ]) \
+        .explode("__bin")
+
+    label = pl.col("__bin")
+    if end_label:
+        label = label.dt.offset_by(every).dt.offset_by("-1d")
+
+    fill_list = []
+    for i, (col, name) in enumerate(pair_list):
+        expr = pl.col(f"__value_{i}")
+        fill_list.append(expr.fill_null(0) if name in ["sum", "count"] else expr)
+
+    df = grid_lf \
+        .join(agg_lf, on = [*group_list, "__bin"], how = "left") \
+        .select([*group_list, label.alias(date_column), *fill_list]) \
+        .collect() \
+        .to_pandas()
+
+    # Categorical groups (e.g. compact collect_data() output) come back in
+    # Polars' category order; restore the pandas categories so groups sort
+    # as with engine = "pandas"
+    if type(data) is pd.DataFrame:
+        for col in group_list:
+            if isinstance(data[col].dtype, pd.CategoricalDtype):
+                df[col] = pd.Categorical(
+                    df[col].astype(object),
+                    categories = data[col].cat.categories,
+                    ordered    = data[col].cat.ordered
+                )
+
+    return _resample_layout(df, date_column, value_column, group_list, agg_func, rule, kind)
+
+
+# NUMPY ENGINE ----
+
+# Bins for the rules the "numpy" engine supports, keyed like DUCKDB_RULES.
+# A date's bin code is (date in `unit` since 1970 - offset) // step, e.g.
+# months // 3 for quarters, or (days - 4) // 7 for weeks starting on Monday
+# 1970-01-05. With end_label the bin is labelled with its last day, as
+# pandas does for "W", "M", "Q" and "Y".
+NUMPY_RULES = {
+    "D"      : ("D", 1, 0, False),
+    "W-SUN"  : ("D", 7, 4, True),
+    "M"      : ("M", 1, 0, True),
+    "MS"     : ("M", 1, 0, False),
+    "Q-DEC"  : ("M", 3, 0, True),
+    "QS-JAN" : ("M", 3, 0, False),
+    "A-DEC"  : ("Y", 1, 0, True),
+    "AS-JAN" : ("Y", 1, 0, False)
+}
+
+
+def _summarize_by_time_numpy(data, date_column, value_column, groups = None, rule = "D", agg_func = np.sum, kind = "timestamp", wide_format = True):
+    """
+    Runs the groupby/resample/agg (and unstack) steps of summarize_by_time() with NumPy.
+
+    Group keys are factorized and dates turned into integer bin codes, so
+    every (group, bin) pair is one cell of a bins x groups matrix. Each
+    aggregate is computed for all cells at once with np.bincount (sum, count)
+    or ufunc.reduceat over the rows sorted by cell (integer sums, min, max).
+    The matrix is the wide output as is; the long output keeps the cells
+    between each group's first and last bin, like the other engines.
+    """
+
+    unit, step, offset, end_label = NUMPY_RULES[_rule_key(rule, NUMPY_RULES, "numpy")]
+
+    group_list = _group_list(groups)
+    pair_list  = _agg_pairs(value_column, agg_func)
+
+    # 1.0 Group codes & bin codes per row
+
+    dates = pd.to_datetime(data[date_column]).to_numpy(dtype = "datetime64[ns]")
+    keep  = ~np.isnat(dates)
+
+    code_list, unique_list = [], []
+    for col in group_list:
+        codes, uniques = pd.factorize(data[col], sort = True)
+        keep &= codes >= 0
+        code_list.append(codes)
+        unique_list.append(uniques)
+
+    bin_codes = (dates[keep].astype(f"datetime64[{unit}]").astype(np.int64) - offset) // step
+
+    if len(group_list) > 0:
+        combined = np.ravel_multi_index(
+            [codes[keep] for codes in code_list],
+            dims = [len(uniques) for uniques in unique_list]
+        )
+        group_ids, group_codes = np.unique(combined, return_inverse = True)
+    else:
+        group_ids, group_codes = np.zeros(1, dtype = np.int64), np.zeros(len(bin_codes), dtype = np.int64)
+
+    n_groups = len(group_ids)
+
+    if len(bin_codes) == 0:
+        raise ValueError("`data` has no rows with a date (and group keys) to summarize.")
+
+    first_code = bin_codes.min()
+    n_bins     = int(bin_codes.max() - first_code + 1)
+
+    # Cell of each row in the bins x groups matrix (group-major, so sorting
+    # by cell sorts by group, then bin)
+    cells   = group_codes * n_bins + (bin_codes - first_code)
+    n_cells = n_groups * n_bins
+
+    order        = np.argsort(cells, kind = "stable")
+    sorted_cells = cells[order]
+    starts       = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]])
+    occupied     = sorted_cells[starts]
+
+    # Each group spans the bins from its first to its last non-empty bin
+    occupied_group = occupied // n_bins
+    occupied_bin   = occupied % n_bins
+    is_first = np.r_[True, occupied_group[1:] != occupied_group[:-1]]
+    is_last  = np.r_[occupied_group[1:] != occupied_group[:-1], True]
+
+    bin_index = np.arange(n_bins)
+    in_span   = (bin_index >= occupied_bin[is_first][:, None]) & (bin_index <= occupied_bin[is_last][:, None])
+
+    # 2.0 Aggregates per cell
+
+    def aggregate(values, name):
+        """One aggregate for every cell (NaN for empty cells, 0 for empty sum/count)."""
+
+        is_float = np.issubdtype(values.dtype, np.floating)
+        notna    = ~np.isnan(values) if is_float else np.ones(len(values), dtype = bool)
+
+        count = np.bincount(cells[notna], minlength = n_cells)
+
+        if name == "count":
+            return count
+
+        if name == "sum" and not is_float:
+            # Accumulate in 64 bits, as pandas does (int8 quantities overflow otherwise)
+            total = np.zeros(n_cells, dtype = _sum_dtype(values.dtype))
+            total[occupied] = np.add.reduceat(values[order], starts, dtype = total.dtype)
+            return total
+
+        if name in ["sum", "mean"]:
+            total = np.bincount(cells, weights = np.where(notna, values, 0), minlength = n_cells)
+            if name == "sum":
+                return total
+            with np.errstate(divide = "ignore", invalid = "ignore"):
+                return total / count
+
+        ufunc = {"min": np.fmin, "max": np.fmax}[name] if is_float else {"min": np.minimum, "max": np.maximum}[name]
+
+        result = np.full(n_cells, np.nan)
+        result[occupied] = ufunc.reduceat(values[order], starts)
+        return result
+
+    values_dict = {}
+    for col in value_column:
+        values = data[col].to_numpy()[keep]
+        if values.dtype == bool:
+            values = values.astype(np.int64)
+        if not (np.issubdtype(values.dtype, np.integer) or np.issubdtype(values.dtype, np.floating)):
+            raise ValueError(f"engine = 'numpy' requires numeric value columns; `{col}` is {data[col].dtype}.")
+        values_dict[col] = values
+
+    matrix_list, int_dtype_list = [], []
+    for col, name in pair_list:
+        values = values_dict[col]
+        matrix = aggregate(values, name).reshape(n_groups, n_bins)
+
+        # Cells outside a group's span are missing, like in the pandas output
+        if not in_span.all():
+            matrix = np.where(in_span, matrix, np.nan)
+
+        matrix_list.append(matrix)
+        # Integer dtype of the aggregate in pandas: int64 counts, 64-bit sums
+        # and min/max in the input dtype (None for float results)
+        if name == "count":
+            int_dtype_list.append(np.dtype(np.int64))
+        elif np.issubdtype(values.dtype, np.integer) and name != "mean":
+            int_dtype_list.append(_sum_dtype(values.dtype) if name == "sum" else values.dtype)
+        else:
+            int_dtype_list.append(None)
+
+    def as_output(values, int_dtype):
+        """Integer aggregates keep their pandas dtype unless empty bins or gaps leave NaN."""
+        if int_dtype is not None and not (values.dtype.kind == "f" and np.isnan(values).any()):
+            return values.astype(int_dtype)
+        return values
+
+    # 3.0 Bin labels & column keys
+
+    bin_starts = ((np.arange(n_bins) + first_code) * step + offset).astype(f"datetime64[{unit}]")
+    if end_label:
+        bin_labels = (bin_starts + step).astype("datetime64[D]") - np.timedelta64(1, "D")
+    else:
+        bin_labels = bin_starts
+    bin_labels = pd.DatetimeIndex(bin_labels.astype("datetime64[ns]"), name = date_column)
+
+    value_keys = list(_agg_columns(value_column, agg_func))
+    if type(agg_func) not in [list, dict]:
+        value_keys = [(col,) for col in value_keys]
+
+    if len(group_list) > 0:
+        dims        = [len(uniques) for uniques in unique_list]
+        level_codes = np.unravel_index(group_ids, dims)
+        group_keys  = [pd.Index(uniques.take(codes)) for uniques, codes in zip(unique_list, level_codes)]
+
+    # 4.0 Wide output: bins x (value, [function], *group keys)
+
+    if wide_format and len(group_list) > 0:
+
+        used_bins = in_span.any(axis = 0)
+
+        # Column of each group in the output. With (value, function) columns and
+        # several groups, pandas unstacks the groups one level at a time, so
+        # its columns are every combination of the group values (unseen ones
+        # all missing); otherwise only the groups in the data
+        column_groups, column_keys = np.arange(n_groups), group_keys
+
+        if type(agg_func) in [list, dict] and len(group_list) > 1:
+            product_codes = [
+                codes.ravel()
+                for codes in np.meshgrid(*[np.unique(codes) for codes in level_codes], indexing = "ij")
+            ]
+            product_ids   = np.ravel_multi_index(product_codes, dims)
+            column_groups = np.minimum(np.searchsorted(group_ids, product_ids), n_groups - 1)
+            column_groups = np.where(group_ids[column_groups] == product_ids, column_groups, -1)
+            column_keys   = [pd.Index(uniques.take(codes)) for uniques, codes in zip(unique_list, product_codes)]
+
+        def wide_block(matrix):
+            block = matrix[:, used_bins].T
+            if (column_groups < 0).any():
+                return np.where(column_groups >= 0, block[:, column_groups], np.nan)
+            return block[:, column_groups]
+
+        df = pd.concat(
+            [
+                pd.DataFrame(as_output(wide_block(matrix), int_dtype))
+                for matrix, int_dtype in zip(matrix_list, int_dtype_list)
+            ],
+            axis = 1
+        )
+
+        n_columns    = len(column_groups)
+        repeat_index = np.tile(np.arange(n_columns), len(value_keys))
+
+        df.columns = pd.MultiIndex.from_arrays(
+            [
+                *[np.repeat([key[level] for key in value_keys], n_columns) for level in range(len(value_keys[0]))],
+                *[keys.take(repeat_index) for keys in column_keys]
+            ],
+            names = [None] * len(value_keys[0]) + group_list
+        )
+        df.index = bin_labels[used_bins]
+
+        if kind == "period":
+            df.index = df.index.to_period()
+
+        return df
+
+    # 5.0 Long output: one row per group and bin in the group's span
+
+    span_groups, span_bins = np.nonzero(in_span)
+
+    df = pd.concat(
+        [
+            pd.Series(as_output(matrix[span_groups, span_bins], int_dtype))
+            for matrix, int_dtype in zip(matrix_list, int_dtype_list)
+        ],
+        axis = 1
+    )
+
+    df.columns = _agg_columns(value_column, agg_func)
+
+    if len(group_list) > 0:
+        df.index = pd.MultiIndex.from_arrays(
+            [*[keys.take(span_groups) for keys in group_keys], bin_labels[span_bins]],
+            names = [*group_list, date_column]
+        )
+    else:
+        df.index = pd.DatetimeIndex(bin_labels, freq = rule)
+        if kind == "period":
+            df.index = df.index.to_period()
+
+    return df
+
+
+def _sum_dtype(dtype):
+    """The dtype pandas sums an integer column in: uint64 for unsigned, int64 otherwise."""
+
+    return np.dtype(np.uint64 if np.issubdtype(dtype, np.unsignedinteger) else np.int64)